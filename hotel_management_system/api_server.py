@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Headless JSON API over HotelDatabase, for tablets and the pager system
+
+A small HTTP/1.1 server on asyncio streams, so it needs nothing beyond
+the standard library. Each client connection is a coroutine and is kept
+alive between requests; database calls go through AsyncHotelDatabase
+(async_database.py), so hundreds of idle or slow clients cost a few
+kilobytes each while the database sees at most ``--readers`` readers and
+one writer. Writes land in the same ``hotel.db`` as the desktop terminals
+and show up there through the change feed.
+
+    GET   /health
+    GET   /faults?status=&room_number=&reporter=&date_from=&date_to=
+                 &sort=date&order=desc&limit=50&cursor=
+    GET   /faults/search?q=&status=&limit=
+    GET   /faults/stats
+    GET   /faults/{id}
+    POST  /faults                  {"room_number", "reporter", "fault_description",
+                                    "date"?, "fault_status"?}
+    PATCH /faults/{id}             {"fault_status"}
+    GET   /shifts/today
+    PUT   /shifts/{date}           {"working_staff", "on_leave", "cover_color"}
+    GET   /special-services/today
+    POST  /special-services        {"service_description", "date"?, "status"?}
+    GET   /menus/today             (ETag / If-None-Match)
+    PUT   /menus/{date}            {"food_menu"}
+    GET   /cocktails               (ETag / If-None-Match)
+    GET   /metrics                 Prometheus text; ?format=json for a JSON snapshot
+
+Fault listings are keyset-paginated: pass ``next_cursor`` of one page as
+``cursor`` to get the next; it is null on the last page.
+
+The server listens on 127.0.0.1 unless ``--host`` says otherwise. Writes
+(every method but GET) need ``Authorization: Bearer <token>`` when a
+token is set with ``--token`` or HOTEL_API_TOKEN, and the server refuses
+to listen beyond loopback without one.
+
+Usage: python api_server.py [--db hotel.db] [--host 127.0.0.1] [--port 8080]
+                            [--readers 8] [--token TOKEN]
+"""
+
+import argparse
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from async_database import AsyncHotelDatabase
+from database import FAULT_FILTERS
+from records import FAULT_COLUMNS, FAULT_STATUSES, SERVICE_STATUSES, Fault, SpecialService
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_BODY_SIZE = 64 * 1024
+MAX_HEADERS = 100
+# Close keep-alive connections that send nothing for this long
+IDLE_TIMEOUT = 30
+
+class HTTPError(Exception):
+    """Ends a request with ``status`` and a JSON error message"""
+
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+class Request:
+    def __init__(self, method, target, version, headers, body=b""):
+        self.method = method
+        parts = urlsplit(target)
+        self.path = parts.path.rstrip("/") or "/"
+        self.query = dict(parse_qsl(parts.query))
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self):
+        """The body as a JSON object"""
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return data
+
+class Response:
+    def __init__(self, data=None, status=HTTPStatus.OK, headers=None,
+                 content_type="application/json; charset=utf-8"):
+        self.status = status
+        self.headers = dict(headers or {})
+        self.content_type = content_type
+        if data is None:
+            self.body = b""
+        elif isinstance(data, str):
+            self.body = data.encode("utf-8")
+        else:
+            self.body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def encode(self, keep_alive):
+        lines = [f"HTTP/1.1 {self.status.value} {self.status.phrase}",
+                 f"Content-Length: {len(self.body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if self.body:
+            lines.append(f"Content-Type: {self.content_type}")
+        lines.extend(f"{name}: {value}" for name, value in self.headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + self.body
+
+def as_dict(record):
+    return record._asdict() if record else None
+
+def encode_cursor(key):
+    """Opaque page cursor for a fault sort key"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(text):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)))
+    except (ValueError, binascii.Error):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid cursor") from None
+    # A sort key holds column values: text or integers
+    if not isinstance(key, list) or not all(
+            isinstance(value, (str, int)) and not isinstance(value, bool) for value in key):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid cursor")
+    return tuple(key)
+
+def entity_tag(body):
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+def check_date(value):
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid date {value!r}, expected YYYY-MM-DD") from None
+    return value
+
+def required_text(data, field):
+    value = data.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{field} is required")
+    return value.strip()
+
+def choice(value, allowed, field):
+    if value not in allowed:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{field} must be one of: {', '.join(allowed)}")
+    return value
+
+def int_param(query, name, default, maximum):
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be an integer") from None
+    if not 1 <= value <= maximum:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"{name} must be between 1 and {maximum}")
+    return value
+
+def today():
+    return datetime.now().strftime('%Y-%m-%d')
+
+async def read_request(reader):
+    """Read one request; None when the client closed the connection"""
+    try:
+        request_line = await reader.readline()
+    except ValueError:
+        raise HTTPError(HTTPStatus.REQUEST_URI_TOO_LONG) from None
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+
+    headers = {}
+    while True:
+        try:
+            line = await reader.readline()
+        except ValueError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE) from None
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(headers) >= MAX_HEADERS:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Chunked bodies are not supported")
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(length) if length else b""
+    return Request(method.upper(), target, version, headers, body)
+
+class HotelAPI:
+    """Routes requests to AsyncHotelDatabase calls"""
+
+    def __init__(self, db, token=None):
+        self.db = db
+        self.token = token
+        # (method, path pattern, handler, send ETag)
+        self.routes = [
+            ("GET", r"/health", self.health, False),
+            ("GET", r"/faults", self.list_faults, False),
+            ("GET", r"/faults/search", self.search_faults, False),
+            ("GET", r"/faults/stats", self.get_fault_stats, False),
+            ("GET", r"/faults/(?P<fault_id>\d+)", self.get_fault, False),
+            ("POST", r"/faults", self.add_fault, False),
+            ("PATCH", r"/faults/(?P<fault_id>\d+)", self.update_fault, False),
+            ("GET", r"/shifts/today", self.get_today_shift, False),
+            ("PUT", r"/shifts/(?P<date>[\d-]+)", self.update_shift, False),
+            ("GET", r"/special-services/today", self.get_today_special_services, False),
+            ("POST", r"/special-services", self.add_special_service, False),
+            ("GET", r"/menus/today", self.get_today_menu, True),
+            ("PUT", r"/menus/(?P<date>[\d-]+)", self.update_menu, False),
+            ("GET", r"/cocktails", self.get_cocktail_recipes, True),
+            ("GET", r"/metrics", self.get_metrics, False),
+        ]
+        self.routes = [(method, re.compile(pattern + "$"), handler, etag)
+                       for method, pattern, handler, etag in self.routes]
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until the client is done"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), IDLE_TIMEOUT)
+                except HTTPError as e:
+                    writer.write(Response({"error": str(e)}, e.status).encode(keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                response = await self.dispatch(request)
+                writer.write(response.encode(request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def dispatch(self, request):
+        allowed = []
+        for method, pattern, handler, etag in self.routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            if method != "GET" and not self.authorized(request):
+                return Response({"error": "Unauthorized"}, HTTPStatus.UNAUTHORIZED,
+                                {"WWW-Authenticate": "Bearer"})
+            try:
+                response = await handler(request, **match.groupdict())
+            except HTTPError as e:
+                return Response({"error": str(e)}, e.status)
+            except Exception as e:
+                print(f"Error handling {request.method} {request.path}: {e}")
+                return Response({"error": "Internal server error"}, HTTPStatus.INTERNAL_SERVER_ERROR)
+            if etag:
+                response = self.conditional(request, response)
+            return response
+        if allowed:
+            return Response({"error": "Method not allowed"}, HTTPStatus.METHOD_NOT_ALLOWED,
+                            {"Allow": ", ".join(allowed)})
+        return Response({"error": "Not found"}, HTTPStatus.NOT_FOUND)
+
+    def authorized(self, request):
+        """Whether a write request carries the shared token, if one is set"""
+        if self.token is None:
+            return True
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        return (scheme.lower() == "bearer"
+                and hmac.compare_digest(credentials.strip().encode(), self.token.encode()))
+
+    def conditional(self, request, response):
+        """Answer 304 when the client already has this representation"""
+        if response.status != HTTPStatus.OK:
+            return response
+        tag = entity_tag(response.body)
+        headers = {"ETag": tag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match == "*" or tag in (t.strip() for t in if_none_match.split(",")):
+            return Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return response
+
+    def not_found(self, what):
+        return HTTPError(HTTPStatus.NOT_FOUND, f"{what} not found")
+
+    # Faults
+    async def health(self, request):
+        return Response({"status": "ok"})
+
+    async def get_metrics(self, request):
+        """Query metrics of the database (see instrumentation.py)"""
+        db = self.db.db
+        retry_stats = db.retry_policy.stats()
+        if request.query.get("format") == "json":
+            return Response(db.metrics.snapshot(retry_stats))
+        return Response(db.metrics.prometheus(retry_stats),
+                        content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    async def list_faults(self, request):
+        query = request.query
+        filters = {name: query[name] for name in FAULT_FILTERS if query.get(name)}
+        for name in ('date_from', 'date_to'):
+            if name in filters:
+                check_date(filters[name])
+        if 'status' in filters:
+            choice(filters['status'], FAULT_STATUSES, 'status')
+        sort = query.get('sort', 'date')
+        if sort not in FAULT_COLUMNS:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"sort must be one of: {', '.join(FAULT_COLUMNS)}")
+        order = choice(query.get('order', 'desc'), ('asc', 'desc'), 'order')
+        cursor = decode_cursor(query['cursor']) if query.get('cursor') else None
+        page_size = int_param(query, 'limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        try:
+            faults, next_key = await self.db.get_faults_page(page_size, cursor,
+                                                             filters=filters, sort=sort,
+                                                             descending=order == 'desc',
+                                                             raise_errors=True)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from None
+        except sqlite3.Error:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Faults could not be read") from None
+        return Response({
+            "items": [as_dict(fault) for fault in faults],
+            "next_cursor": encode_cursor(next_key) if next_key is not None else None,
+        })
+
+    async def search_faults(self, request):
+        text = request.query.get('q', '').strip()
+        if not text:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "q is required")
+        status = request.query.get('status') or None
+        if status:
+            choice(status, FAULT_STATUSES, 'status')
+        limit = int_param(request.query, 'limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        faults = await self.db.search_faults(text, status, limit=limit)
+        return Response({"items": [as_dict(fault) for fault in faults]})
+
+    async def get_fault_stats(self, request):
+        return Response(await self.db.fault_stats())
+
+    async def get_fault(self, request, fault_id):
+        fault = await self.db.get_fault_by_id(int(fault_id))
+        if not fault:
+            raise self.not_found("Fault")
+        return Response(as_dict(fault))
+
+    async def add_fault(self, request):
+        data = request.json()
+        fault = (
+            check_date(data.get('date') or today()),
+            required_text(data, 'room_number'),
+            required_text(data, 'reporter'),
+            required_text(data, 'fault_description'),
+            choice(data.get('fault_status', "Bekleniyor"), FAULT_STATUSES, 'fault_status'),
+        )
+        fault_id = await self.db.add_fault(*fault)
+        if not fault_id:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Fault could not be saved")
+        return Response(as_dict(Fault(fault_id, *fault)), HTTPStatus.CREATED,
+                        {"Location": f"/faults/{fault_id}"})
+
+    async def update_fault(self, request, fault_id):
+        status = choice(request.json().get('fault_status'), FAULT_STATUSES, 'fault_status')
+        changed = await self.db.update_fault_status(int(fault_id), status)
+        if changed is None:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Fault status could not be saved")
+        if not changed:
+            raise self.not_found("Fault")
+        return await self.get_fault(request, fault_id)
+
+    # Shifts, special services, menus and recipes
+    async def get_today_shift(self, request):
+        shift = await self.db.get_today_shift()
+        if not shift:
+            raise self.not_found("Shift for today")
+        return Response(as_dict(shift))
+
+    async def update_shift(self, request, date):
+        data = request.json()
+        values = [data.get(field, "") for field in ('working_staff', 'on_leave', 'cover_color')]
+        if not all(isinstance(value, str) for value in values):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Shift fields must be strings")
+        if not await self.db.update_shift(check_date(date), *values):
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Shift could not be saved")
+        return Response({"date": date, "working_staff": values[0], "on_leave": values[1],
+                         "cover_color": values[2]})
+
+    async def get_today_special_services(self, request):
+        services = await self.db.get_today_special_services()
+        return Response({"items": [as_dict(s) for s in services]})
+
+    async def add_special_service(self, request):
+        data = request.json()
+        service = (
+            check_date(data.get('date') or today()),
+            required_text(data, 'service_description'),
+            choice(data.get('status', "Beklemede"), SERVICE_STATUSES, 'status'),
+        )
+        service_id = await self.db.add_special_service(*service)
+        if not service_id:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Special service could not be saved")
+        return Response(as_dict(SpecialService(service_id, *service)),
+                        HTTPStatus.CREATED)
+
+    async def get_today_menu(self, request):
+        menu = await self.db.get_today_menu()
+        if not menu:
+            raise self.not_found("Menu for today")
+        return Response(as_dict(menu))
+
+    async def update_menu(self, request, date):
+        food_menu = required_text(request.json(), 'food_menu')
+        if not await self.db.update_menu(check_date(date), food_menu):
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Menu could not be saved")
+        return Response({"date": date, "food_menu": food_menu})
+
+    async def get_cocktail_recipes(self, request):
+        recipes = await self.db.get_cocktail_recipes()
+        return Response({"items": [as_dict(r) for r in recipes]})
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+async def serve(db_name, host, port, readers, token=None):
+    async with AsyncHotelDatabase(db_name, readers=readers) as db:
+        api = HotelAPI(db, token)
+        # A large backlog absorbs bursts of tablets connecting at shift change
+        server = await asyncio.start_server(api.handle_connection, host, port, backlog=1024)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"🌐 Hotel API listening on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Otel yönetim sistemi için JSON API sunucusu")
+    parser.add_argument("--db", default="hotel.db", help="database file (default: hotel.db)")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    parser.add_argument("--readers", type=int, default=8,
+                        help="reader connections; writes use one more (default: 8)")
+    parser.add_argument("--token", default=os.environ.get("HOTEL_API_TOKEN") or None,
+                        help="shared token required for writes (default: $HOTEL_API_TOKEN)")
+    args = parser.parse_args(argv)
+
+    if not args.token and not is_loopback(args.host):
+        print(f"❌ Refusing to listen on {args.host} without a token: anyone on the network "
+              "could change faults, shifts and menus. Set --token or HOTEL_API_TOKEN.")
+        return 1
+    try:
+        asyncio.run(serve(args.db, args.host, args.port, args.readers, args.token or None))
+    except KeyboardInterrupt:
+        print("\n🛑 Hotel API stopped")
+    except OSError as e:
+        print(f"❌ Could not start the API server: {e}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Archiving of closed faults and database compaction
+
+Faults that are resolved ("Çözüldü") or unresolvable ("Çözülemedi") and
+older than a configurable age are moved out of the live ``faults`` table
+into one archive file per year (``faults_YYYY.db`` next to the database),
+which is ATTACHed only while it is written or read. The live table, its
+indexes and backups stay small; ``HotelDatabase.get_all_faults`` and
+``get_fault_by_id`` can still include archived faults on request.
+
+Each year is moved in two steps: rows are first copied into the archive
+and committed, then deleted from the live table only if they are in the
+archive. A crash in between leaves a fault in both places (reads prefer
+the live copy, and the next run finishes the move) but never loses one.
+
+Nothing is archived automatically: run this module by hand, or from a
+scheduled task with ``--if-due`` so that only one run per week does the
+work however many terminals schedule it.
+
+Usage: python archive.py [--db hotel.db] [--older-than-days 365] [--compact]
+                         [--if-due]
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from database import FAULT_COLUMNS, HotelDatabase
+from records import Fault, select_list, to_records
+
+CLOSED_STATUSES = ("Çözüldü", "Çözülemedi")
+
+ARCHIVE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS archive.faults (
+        id INTEGER PRIMARY KEY,
+        date TEXT NOT NULL,
+        room_number TEXT NOT NULL,
+        reporter TEXT NOT NULL,
+        fault_description TEXT NOT NULL,
+        fault_status TEXT NOT NULL
+    )
+'''
+
+def archive_path(db_name, year):
+    """Archive file for one year, in the same directory as the database"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_name)), f"faults_{year}.db")
+
+def archive_files(db_name):
+    """Existing archive files, oldest year first"""
+    pattern = os.path.join(os.path.dirname(os.path.abspath(db_name)), "faults_[0-9][0-9][0-9][0-9].db")
+    return sorted(glob.glob(pattern))
+
+@contextmanager
+def attached(conn, path):
+    """Attach ``path`` as ``archive`` for the duration of the block"""
+    conn.execute('ATTACH DATABASE ? AS archive', (path,))
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.execute('DETACH DATABASE archive')
+
+def read_archived_faults(db, fault_id=None):
+    """Archived faults from every archive file, or just the one with ``fault_id``"""
+    where, params = ('WHERE id = ?', (fault_id,)) if fault_id is not None else ('', ())
+    faults = []
+    with db.get_connection() as conn:
+        for path in archive_files(db.db_name):
+            with attached(conn, path):
+                if not conn.execute("SELECT 1 FROM archive.sqlite_master "
+                                    "WHERE type = 'table' AND name = 'faults'").fetchone():
+                    continue
+                faults.extend(to_records(Fault, conn.execute(
+                    f'SELECT {select_list(Fault)} FROM archive.faults {where}', params
+                ).fetchall()))
+    return faults
+
+def _move_year(conn, db_name, year, cutoff):
+    where = (f'fault_status IN ({", ".join("?" for _ in CLOSED_STATUSES)}) '
+             'AND date < ? AND substr(date, 1, 4) = ?')
+    params = CLOSED_STATUSES + (cutoff, year)
+    columns = ", ".join(FAULT_COLUMNS)
+    with attached(conn, archive_path(db_name, year)):
+        conn.execute(ARCHIVE_SCHEMA)
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute(f'INSERT OR REPLACE INTO archive.faults ({columns}) '
+                     f'SELECT {columns} FROM main.faults WHERE {where}', params)
+        conn.commit()
+        conn.execute('BEGIN IMMEDIATE')
+        moved = conn.execute(f'DELETE FROM main.faults WHERE {where} '
+                             'AND id IN (SELECT id FROM archive.faults)', params).rowcount
+        conn.commit()
+    return moved
+
+def archive_closed_faults(db, older_than_days=365, today=None):
+    """Move closed faults older than ``older_than_days`` into the yearly archives.
+    
+    Returns ``{year: faults moved}``. Safe to run again after an
+    interruption, and from several terminals.
+    """
+    today = today or datetime.now().date()
+    cutoff = (today - timedelta(days=older_than_days)).strftime('%Y-%m-%d')
+    moved = {}
+    with db.get_connection() as conn:
+        years = [row[0] for row in conn.execute(f'''
+            SELECT DISTINCT substr(date, 1, 4) FROM faults
+            WHERE fault_status IN ({", ".join("?" for _ in CLOSED_STATUSES)}) AND date < ?
+        ''', CLOSED_STATUSES + (cutoff,))]
+        for year in years:
+            moved[year] = db.retry_policy.call(_move_year, conn, db.db_name, year, cutoff)
+    return moved
+
+def compact(db):
+    """Give free pages back to the file system and refresh planner statistics.
+    
+    The first run switches the file to incremental auto-vacuum, which
+    needs one full VACUUM; later runs only release the free pages.
+    Returns the number of bytes saved.
+    """
+    with db.get_connection() as conn:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        before = conn.execute('PRAGMA page_count').fetchone()[0]
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            db.retry_policy.call(conn.execute, 'VACUUM')
+        else:
+            # executescript() steps the pragma to the end; execute() would
+            # free a single page
+            db.retry_policy.call(conn.executescript, 'PRAGMA incremental_vacuum')
+        conn.execute('PRAGMA optimize')
+        after = conn.execute('PRAGMA page_count').fetchone()[0]
+        # Shrink the WAL file as well
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+    return max(before - after, 0) * page_size
+
+def _claim(db, task, interval_days):
+    """Record that ``task`` runs now if it has not run within ``interval_days``.
+    
+    Only one terminal gets True for each interval.
+    """
+    now = datetime.now()
+    with db.get_connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        row = conn.execute('SELECT last_run FROM maintenance_log WHERE task = ?', (task,)).fetchone()
+        if row and datetime.fromisoformat(row[0]) > now - timedelta(days=interval_days):
+            return False
+        db._upsert(conn, 'maintenance_log', {'task': task, 'last_run': now.isoformat()},
+                   key_columns=('task',))
+    return True
+
+def run_due_maintenance(db, archive_after_days=365, interval_days=7):
+    """Archive and compact if no run has done so in ``interval_days`` days.
+    
+    Used by ``archive.py --if-due`` for scheduled runs. Returns a summary
+    dict, or None when nothing was due.
+    """
+    try:
+        if not db.retry_policy.call(_claim, db, "archive_and_compact", interval_days):
+            return None
+        moved = archive_closed_faults(db, archive_after_days)
+        saved = compact(db)
+    except sqlite3.Error as e:
+        print(f"Error running database maintenance: {e}")
+        return None
+    return {"archived": moved, "bytes_saved": saved}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kapanmış arızaları arşivle ve veritabanını sıkıştır")
+    parser.add_argument("--db", default="hotel.db", help="database file (default: hotel.db)")
+    parser.add_argument("--older-than-days", type=int, default=365,
+                        help="archive closed faults older than this (default: 365)")
+    parser.add_argument("--compact", action="store_true", help="also VACUUM the database")
+    parser.add_argument("--if-due", action="store_true",
+                        help="archive and compact only if not done in the last 7 days "
+                             "(for scheduled tasks)")
+    args = parser.parse_args(argv)
+    
+    db = HotelDatabase(args.db)
+    if args.if_due:
+        try:
+            summary = run_due_maintenance(db, args.older_than_days)
+        finally:
+            db.close()
+        if summary is None:
+            print("📦 Maintenance not due or failed")
+        else:
+            print(f"📦 Archived {sum(summary['archived'].values())} faults, "
+                  f"{summary['bytes_saved'] / 1024:.0f} KB freed")
+        return 0
+    try:
+        moved = archive_closed_faults(db, args.older_than_days)
+        for year, count in sorted(moved.items()):
+            print(f"📦 {count} faults moved to {archive_path(args.db, year)}")
+        if not moved:
+            print("📦 No closed faults to archive")
+        if args.compact:
+            print(f"🧹 Compacted, {compact(db) / 1024:.0f} KB freed")
+    except sqlite3.Error as e:
+        print(f"❌ Archiving failed: {e}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
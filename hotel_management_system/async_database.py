@@ -0,0 +1,110 @@
+"""
+Coroutine interface to HotelDatabase for asyncio services
+
+AsyncHotelDatabase mirrors the public HotelDatabase methods as
+coroutines. Reads run on a pool of reader threads and every write runs on
+one dedicated writer thread, so writes from this process never contend
+for SQLite's write lock with each other and never block the event loop.
+All threads borrow from one HotelDatabase connection pool sized to the
+number of threads, so any number of concurrent requests share a bounded
+number of connections (and the same query cache) while waiting their turn
+on the loop instead of on a lock.
+
+    async with AsyncHotelDatabase("hotel.db", readers=4) as db:
+        fault_id = await db.add_fault("2025-06-01", "204", "HK", "Klima arızalı")
+        pending = await db.get_pending_faults()
+
+Callbacks such as the ``progress`` argument of the bulk inserts are called
+on the writer thread.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from database import HotelDatabase
+from fault_stats import fault_stats
+
+# HotelDatabase methods by the thread they run on
+READ_METHODS = (
+    "get_pending_faults", "get_all_faults", "get_faults_page", "count_faults",
+    "get_fault_by_id", "search_faults", "get_today_shift", "get_today_special_services",
+    "search_special_services", "get_today_menu", "get_cocktail_recipes",
+    "current_revision", "changes_since", "get_faults_by_ids", "get_special_services_by_ids",
+)
+WRITE_METHODS = (
+    "init_db", "add_fault", "update_fault_status", "add_faults_bulk", "update_shift",
+    "add_special_service", "add_special_services_bulk", "add_shifts_bulk", "add_menus_bulk",
+    "update_menu", "prune_change_log",
+)
+
+def _reader(name):
+    method = getattr(HotelDatabase, name)
+
+    @functools.wraps(method)
+    async def coroutine(self, *args, **kwargs):
+        return await self._run(self._readers, method, self.db, *args, **kwargs)
+    return coroutine
+
+def _writer(name):
+    method = getattr(HotelDatabase, name)
+
+    @functools.wraps(method)
+    async def coroutine(self, *args, **kwargs):
+        return await self._run(self._writer, method, self.db, *args, **kwargs)
+    return coroutine
+
+class AsyncHotelDatabase:
+    """HotelDatabase methods as coroutines: reader pool plus one writer thread"""
+
+    def __init__(self, db_name="hotel.db", readers=4, db=None, **options):
+        # Pass ``db`` to share an existing HotelDatabase (its pool should
+        # have at least readers + 1 connections); otherwise one is opened.
+        self.db = db or HotelDatabase(db_name, pool_size=readers + 1, **options)
+        self._owns_db = db is None
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+
+    async def _run(self, executor, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    async def iter_faults(self, status=None, batch_size=500, filters=None, sort='date',
+                          descending=True):
+        """Async iterator over faults, read one keyset page at a time.
+
+        Unlike HotelDatabase.iter_faults() no connection is held between
+        batches, so a slow consumer does not tie up a reader.
+        """
+        cursor = None
+        while True:
+            faults, cursor = await self.get_faults_page(batch_size, cursor, status, filters,
+                                                        sort, descending)
+            for fault in faults:
+                yield fault
+            if cursor is None:
+                break
+
+    async def fault_stats(self, days=14):
+        """fault_stats.fault_stats() on a reader thread"""
+        return await self._run(self._readers, fault_stats, self.db, days)
+
+    async def close(self):
+        """Wait for queued calls, then close the connections if we opened them"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._writer.shutdown)
+        await loop.run_in_executor(None, self._readers.shutdown)
+        if self._owns_db:
+            self.db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+for _name in READ_METHODS:
+    setattr(AsyncHotelDatabase, _name, _reader(_name))
+for _name in WRITE_METHODS:
+    setattr(AsyncHotelDatabase, _name, _writer(_name))
+del _name
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for HotelDatabase and the fault table
+
+For each size a temporary database is filled with seeded synthetic data
+(synthetic_data.py: years of faults across 360 rooms, daily shifts,
+menus and special services), then every HotelDatabase method and the
+fault table population paths are timed. Results are printed and can be
+written as JSON; ``--compare`` checks them against an earlier JSON file
+and exits with status 1 when a case got slower than the threshold, so
+two versions can be compared on identical data.
+
+F&B reads are timed without the query cache (the SQL itself) and again
+through it, marked "[cached]". The QTableWidget population that the
+paged FaultTableModel replaced is kept for comparison up to 100k rows.
+The "rows:" cases and the bytes-per-row figures compare plain tuples,
+the Fault records from records.py and a four-column query.
+
+Usage: python benchmark.py [--sizes 1000 10000 100000 1000000] [--seed 0]
+                           [--repeat 5] [--output results.json]
+                           [--compare baseline.json] [--no-ui]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from database import HotelDatabase
+from fault_stats import fault_stats
+from records import Fault, select_list, to_records
+from synthetic_data import ROOMS, generate_faults, populate
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+# The legacy QTableWidget population takes minutes beyond this
+LEGACY_TABLE_MAX_ROWS = 100000
+# A case this much slower than the baseline (and by more than
+# MIN_REGRESSION_SECONDS) is reported as a regression
+REGRESSION_THRESHOLD = 1.25
+MIN_REGRESSION_SECONDS = 0.001
+
+def measure(func, repeat):
+    """Run ``func`` ``repeat`` times; it returns the number of rows it handled"""
+    times = []
+    rows = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = func()
+        times.append(time.perf_counter() - start)
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "mean": statistics.mean(times),
+        "runs": repeat,
+        "rows": rows,
+    }
+
+def read_cases(db, cached_db, size, seed):
+    """(name, function) pairs timing the HotelDatabase reads"""
+    rng = random.Random(seed)
+    middle = db.get_fault_by_id(size // 2 or 1)
+    middle_key = (middle.date, middle.id)
+    # Warm the cache so the [cached] cases time hits
+    cached_db.get_today_shift()
+    cached_db.get_today_special_services()
+    cached_db.get_today_menu()
+    cached_db.get_cocktail_recipes()
+
+    def random_fault_id():
+        return rng.randint(1, size)
+
+    return [
+        ("get_pending_faults", lambda: len(db.get_pending_faults())),
+        ("get_all_faults", lambda: len(db.get_all_faults())),
+        ("get_faults_page (first)", lambda: len(db.get_faults_page(100)[0])),
+        ("get_faults_page (middle)", lambda: len(db.get_faults_page(100, middle_key)[0])),
+        ("get_faults_page (filtered, by room)",
+         lambda: len(db.get_faults_page(100, filters={'reporter': 'HK'}, sort='room_number')[0])),
+        ("iter_faults", lambda: sum(1 for _ in db.iter_faults())),
+        ("count_faults", lambda: db.count_faults()),
+        ("count_faults (pending)", lambda: db.count_faults("Bekleniyor")),
+        ("get_fault_by_id", lambda: len([db.get_fault_by_id(random_fault_id())])),
+        ("get_faults_by_ids (100)",
+         lambda: len(db.get_faults_by_ids([random_fault_id() for _ in range(100)]))),
+        ("search_faults", lambda: len(db.search_faults("klima"))),
+        ("search_faults (pending)", lambda: len(db.search_faults("klima", status="Bekleniyor"))),
+        ("fault_stats", lambda: len(fault_stats(db))),
+        ("get_today_shift", lambda: len([db.get_today_shift()])),
+        ("get_today_shift [cached]", lambda: len([cached_db.get_today_shift()])),
+        ("get_today_special_services", lambda: len(db.get_today_special_services())),
+        ("get_today_special_services [cached]",
+         lambda: len(cached_db.get_today_special_services())),
+        ("search_special_services", lambda: len(db.search_special_services("pasta"))),
+        ("get_today_menu", lambda: len([db.get_today_menu()])),
+        ("get_today_menu [cached]", lambda: len([cached_db.get_today_menu()])),
+        ("get_cocktail_recipes", lambda: len(db.get_cocktail_recipes())),
+        ("get_cocktail_recipes [cached]", lambda: len(cached_db.get_cocktail_recipes())),
+        ("current_revision", lambda: len([db.current_revision()])),
+        ("changes_since (1000)", lambda: len(db.changes_since(0))),
+    ]
+
+def row_cases(db):
+    """(name, function) pairs fetching every fault in different row shapes"""
+    def fetch(sql, wrap=None):
+        with db.get_connection() as conn:
+            rows = conn.execute(sql).fetchall()
+        return wrap(rows) if wrap else rows
+
+    return [
+        ("rows: plain tuples", lambda: fetch(f'SELECT {select_list(Fault)} FROM faults')),
+        ("rows: Fault records",
+         lambda: fetch(f'SELECT {select_list(Fault)} FROM faults', lambda rows: to_records(Fault, rows))),
+        ("rows: 4 columns", lambda: fetch('SELECT id, date, room_number, fault_status FROM faults')),
+    ]
+
+def row_memory(cases):
+    """(held, peak) bytes per row for the result of each row_cases() function
+
+    The peak includes the fetched rows that a wrapped result was built from.
+    """
+    memory = {}
+    for name, func in cases:
+        tracemalloc.start()
+        try:
+            rows = func()
+            held, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        count = max(len(rows), 1)
+        memory[name] = (held / count, peak / count)
+        del rows
+    return memory
+
+def write_cases(db, size, seed):
+    """(name, function) pairs timing the HotelDatabase writes; run last"""
+    rng = random.Random(seed)
+    today = datetime.now().strftime('%Y-%m-%d')
+    statuses = itertools.cycle(["Çözüldü", "Bekleniyor"])
+    return [
+        ("add_fault", lambda: 1 if db.add_fault(today, rng.choice(ROOMS), "HK", "Benchmark arızası") else 0),
+        ("update_fault_status", lambda: db.update_fault_status(rng.randint(1, size), next(statuses))),
+        ("add_faults_bulk (1000)",
+         lambda: db.add_faults_bulk(generate_faults(1000, seed + 1, years=0.1))),
+        ("update_shift", lambda: 1 if db.update_shift(today, "Ahmet, Ayşe", "Mehmet", "Mavi") else 0),
+        ("add_special_service", lambda: 1 if db.add_special_service(today, "Benchmark servisi") else 0),
+        ("update_menu", lambda: 1 if db.update_menu(today, "Mercimek çorbası\nPilav") else 0),
+    ]
+
+def ui_cases(db, size):
+    """(name, function, repeat override) pairs for the fault table population paths"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QTableView
+    from PyQt5.QtCore import Qt
+    from ui_fault_management import FaultTableModel
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    view = QTableView()
+    model = FaultTableModel(db)
+    view.setModel(model)
+
+    def first_page():
+        model.load()
+        return model.rowCount()
+
+    def scroll_to_end():
+        model.load()
+        while model.canFetchMore():
+            model.fetchMore()
+        return model.rowCount()
+
+    def legacy_population():
+        # The refresh before FaultTableModel: everything, one item per cell
+        table = QTableWidget()
+        table.setColumnCount(6)
+        faults = db.get_all_faults()
+        table.setRowCount(len(faults))
+        for row, fault in enumerate(faults):
+            for col, data in enumerate(fault):
+                item = QTableWidgetItem(str(data))
+                if col == 5:
+                    item.setBackground({"Bekleniyor": Qt.yellow, "Çözüldü": Qt.green,
+                                        "Çözülemedi": Qt.red}.get(data, Qt.white))
+                table.setItem(row, col, item)
+        table.deleteLater()
+        app.processEvents()
+        return len(faults)
+
+    cases = [("FaultTableModel.load", first_page, None),
+             ("FaultTableModel scroll to end", scroll_to_end, None)]
+    if size <= LEGACY_TABLE_MAX_ROWS:
+        cases.append(("QTableWidget full population", legacy_population, 1))
+    return cases
+
+def run_size(size, seed, repeat, ui):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        db = HotelDatabase(path, cache=False)
+        cached_db = HotelDatabase(path)
+        try:
+            start = time.perf_counter()
+            counts = populate(db, size, seed)
+            result = {"populate": {"seconds": time.perf_counter() - start, "rows": counts},
+                      "cases": {}}
+            print(f"\n📦 {size} faults ({counts['special_services']} special services, "
+                  f"{counts['shifts']} days) generated in {result['populate']['seconds']:.2f}s")
+            print(f"   {'case':<40} {'median ms':>11} {'min ms':>10} {'rows':>9}")
+
+            # Writes last, so the reads and the table see exactly ``size`` faults
+            cases = [(name, func, None) for name, func in read_cases(db, cached_db, size, seed)]
+            cases.extend((name, lambda func=func: len(func()), None) for name, func in row_cases(db))
+            if ui:
+                try:
+                    cases.extend(ui_cases(db, size))
+                except ImportError as e:
+                    print(f"   ⚠️ UI cases skipped: {e}")
+            cases.extend((name, func, None) for name, func in write_cases(db, size, seed))
+            for name, func, runs in cases:
+                timing = measure(func, runs or repeat)
+                result["cases"][name] = timing
+                rows = "" if timing["rows"] is None else timing["rows"]
+                print(f"   {name:<40} {timing['median'] * 1000:>11.3f} "
+                      f"{timing['min'] * 1000:>10.3f} {rows:>9}")
+            memory = row_memory(row_cases(db))
+            result["bytes_per_row"] = {name: held for name, (held, _) in memory.items()}
+            result["peak_bytes_per_row"] = {name: peak for name, (_, peak) in memory.items()}
+            for name, (held, peak) in memory.items():
+                print(f"   {name:<40} {held:>11.0f} bytes/row held, {peak:.0f} peak")
+        finally:
+            cached_db.close()
+            db.close()
+    return result
+
+def environment(seed, repeat):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+    }
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Print median changes against ``baseline``; return the regressed cases"""
+    regressions = []
+    print(f"\n📈 Compared with {baseline['meta'].get('commit') or 'baseline'} "
+          f"({baseline['meta'].get('created')})")
+    for size, result in results["results"].items():
+        old_cases = baseline["results"].get(size, {}).get("cases", {})
+        for name, timing in result["cases"].items():
+            old = old_cases.get(name)
+            if not old or not old["median"]:
+                continue
+            ratio = timing["median"] / old["median"]
+            slower = (ratio > threshold
+                      and timing["median"] - old["median"] > MIN_REGRESSION_SECONDS)
+            if slower:
+                regressions.append((size, name, ratio))
+            mark = "❌" if slower else ("✅" if ratio < 1 / threshold else "  ")
+            print(f"{mark} {size:>8} {name:<40} {old['median'] * 1000:>10.3f} -> "
+                  f"{timing['median'] * 1000:>10.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HotelDatabase ve arıza tablosu performans ölçümü")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="fault counts to benchmark (default: 1000 10000 100000)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case (default: 5)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown factor reported as a regression (default: 1.25)")
+    parser.add_argument("--no-ui", action="store_true", help="skip the PyQt5 table cases")
+    args = parser.parse_args(argv)
+
+    results = {"meta": environment(args.seed, args.repeat), "results": {}}
+    for size in args.sizes:
+        results["results"][str(size)] = run_size(size, args.seed, args.repeat, not args.no_ui)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} case(s) slower than {args.threshold}x the baseline")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Pushes changes made by any terminal into the open views.
+
+ChangeFeedPoller checks ``PRAGMA data_version`` every few seconds on a
+worker thread. Only when another connection has committed does it read
+``changes_since(last_revision)`` and the affected rows, then emit them
+so views can patch themselves instead of reloading. A read that fails
+leaves the revision where it was and is retried on the next poll, even
+though data_version no longer shows the commit.
+"""
+
+import sqlite3
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from database import get_database
+from db_workers import DatabaseTaskRunner
+from query_cache import DataVersionWatcher
+
+_poller = None
+
+def shared_poller():
+    """The process-wide poller, started on first use"""
+    global _poller
+    if _poller is None:
+        _poller = ChangeFeedPoller(get_database())
+        _poller.start()
+    return _poller
+
+def collect_changes(db, since, limit=1000):
+    """Read the changes after ``since`` and the current state of those rows.
+
+    Runs on a worker thread. Returns a dict with the new revision and, per
+    table, the changed rows and the ids that were deleted. Raises
+    sqlite3.Error rather than returning a partial result.
+    """
+    changes = db.changes_since(since, limit, raise_errors=True)
+    latest = {}
+    for revision, table, row_id, operation in changes:
+        latest[(table, row_id)] = operation
+        since = revision
+
+    deleted = {"faults": set(), "special_services": set()}
+    changed = {"faults": set(), "special_services": set()}
+    day_tables = set()
+    for (table, row_id), operation in latest.items():
+        if table in changed:
+            (deleted if operation == "delete" else changed)[table].add(row_id)
+        else:
+            day_tables.add(table)
+
+    return {
+        "revision": since,
+        "more": len(changes) == limit,
+        "faults": (db.get_faults_by_ids(changed["faults"], raise_errors=True)
+                   if changed["faults"] else [], deleted["faults"]),
+        "special_services": (db.get_special_services_by_ids(changed["special_services"],
+                                                            raise_errors=True)
+                             if changed["special_services"] else [],
+                             deleted["special_services"]),
+        "shift": db.get_today_shift(raise_errors=True) if "shifts" in day_tables else None,
+        "menu": db.get_today_menu(raise_errors=True) if "menus" in day_tables else None,
+        "day_tables": day_tables,
+    }
+
+class ChangeFeedPoller(QObject):
+    # (changed rows, deleted ids)
+    faults_changed = pyqtSignal(list, set)
+    special_services_changed = pyqtSignal(list, set)
+    # today's row after a change
+    shift_changed = pyqtSignal(object)
+    menu_changed = pyqtSignal(object)
+
+    def __init__(self, db, interval_ms=2000, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.revision = None
+        # Set on the worker thread when a read fails; polls never overlap
+        self.read_failed = False
+        self.runner = DatabaseTaskRunner(self)
+        self.watcher = DataVersionWatcher(db.db_name)
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.poll)
+
+    def start(self):
+        self.runner.submit("start", self.db.current_revision, on_result=self._started)
+
+    def stop(self):
+        self.timer.stop()
+        self.runner.cancel_all()
+
+    def _started(self, revision):
+        self.revision = revision
+        self.timer.start()
+
+    def poll(self):
+        """Look for new changes unless a poll is still running"""
+        if self.revision is None or self.runner.is_busy("poll"):
+            return
+        self.runner.submit("poll", self._read_changes, self.revision, on_result=self._apply)
+
+    def _read_changes(self, since, force=False):
+        # changed() reports a commit only once, so after a failed read the
+        # watcher is skipped until the changes have been read
+        if not (force or self.read_failed) and not self.watcher.changed():
+            return None
+        try:
+            result = collect_changes(self.db, since)
+        except sqlite3.Error as e:
+            print(f"Error reading changes: {e}")
+            self.read_failed = True
+            return None
+        self.read_failed = False
+        return result
+
+    def _apply(self, result):
+        if result is None:
+            return
+        self.revision = result["revision"]
+        rows, deleted = result["faults"]
+        if rows or deleted:
+            self.faults_changed.emit(rows, deleted)
+        rows, deleted = result["special_services"]
+        if rows or deleted:
+            self.special_services_changed.emit(rows, deleted)
+        if "shifts" in result["day_tables"]:
+            self.shift_changed.emit(result["shift"])
+        if "menus" in result["day_tables"]:
+            self.menu_changed.emit(result["menu"])
+        if result["more"]:
+            # A large batch was truncated; fetch the rest straight away
+            self.runner.submit("poll", self._read_changes, self.revision, True,
+                               on_result=self._apply)
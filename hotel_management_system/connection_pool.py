@@ -0,0 +1,288 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+
+# PRAGMA profiles applied once to every new connection. "default" keeps
+# the rollback journal, which is safe for terminals sharing hotel.db on a
+# network share; "network_share" is the same and kept for existing
+# HOTEL_DB_PROFILE settings. "local_wal" is faster but only for terminals
+# on the machine that holds the file: WAL needs shared memory that
+# network file systems do not provide, and the journal mode is stored in
+# the file, so one terminal choosing WAL switches it for all of them.
+_ROLLBACK_JOURNAL = {
+    "busy_timeout": 10000,
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": -8000,
+    "mmap_size": 0,
+    "temp_store": "MEMORY",
+}
+PROFILES = {
+    "default": dict(_ROLLBACK_JOURNAL),
+    "network_share": dict(_ROLLBACK_JOURNAL),
+    "local_wal": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -8000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+    },
+}
+
+# Linux file system types (/proc/mounts) that are reached over the network
+NETWORK_FILE_SYSTEMS = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "9p", "afs", "ncpfs",
+                        "davfs", "fuse.sshfs"}
+
+
+def resolve_profile(profile):
+    """Turn a profile name or PRAGMA dict into a PRAGMA dict"""
+    if profile is None:
+        return dict(PROFILES["default"])
+    if isinstance(profile, str):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown database profile: {profile}")
+        return dict(PROFILES[profile])
+    return dict(profile)
+
+
+def is_network_path(path):
+    """Best-effort check whether ``path`` lives on a network file system"""
+    path = os.path.abspath(path)
+    if os.name == "nt":
+        if path.startswith("\\\\"):
+            return True
+        import ctypes
+        drive = os.path.splitdrive(path)[0] + "\\"
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    # The longest mount point containing the file decides
+    best, fstype = "", None
+    for mount_point, kind in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if ((path == mount_point or path.startswith(mount_point.rstrip("/") + "/"))
+                and len(mount_point) > len(best)):
+            best, fstype = mount_point, kind
+    return fstype in NETWORK_FILE_SYSTEMS
+
+
+def is_busy_error(error):
+    """True for SQLITE_BUSY / SQLITE_LOCKED errors"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+class RetryPolicy:
+    """Retry a callable on SQLITE_BUSY with jittered exponential backoff"""
+
+    def __init__(self, attempts=5, base_delay=0.05, max_delay=1.0):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self.busy_events = 0
+        self.failures = 0
+        self.wait_time = 0.0
+
+    def call(self, func, *args, **kwargs):
+        delay = self.base_delay
+        for attempt in range(1, self.attempts + 1):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                with self._lock:
+                    self.busy_events += 1
+                    if attempt == self.attempts:
+                        self.failures += 1
+                if attempt == self.attempts:
+                    raise
+                self.backoff(min(delay, self.max_delay) * random.uniform(0.5, 1.0))
+                delay *= 2
+
+    def backoff(self, pause):
+        """Sleep ``pause`` seconds before the next attempt"""
+        time.sleep(pause)
+        with self._lock:
+            self.wait_time += pause
+
+    def stats(self):
+        """Snapshot of busy/retry counters"""
+        with self._lock:
+            return {
+                "busy_events": self.busy_events,
+                "failures": self.failures,
+                "wait_time": self.wait_time,
+            }
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes free in time"""
+
+
+class ConnectionPool:
+    """Small bounded pool of long-lived SQLite connections.
+
+    Connections are opened lazily, handed out with ``connection()`` and
+    returned to the pool when the ``with`` block ends. A connection that
+    fails its health check on checkout is discarded and replaced.
+    """
+
+    def __init__(self, db_name, max_size=4, timeout=10.0, pragmas=None, connect=None):
+        self.db_name = db_name
+        # connect(db_name, **kwargs) opens a connection, sqlite3.connect by default
+        self.connect = connect or sqlite3.connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = resolve_profile(pragmas)
+        if (str(self.pragmas.get("journal_mode", "")).upper() == "WAL"
+                and is_network_path(db_name)):
+            raise ValueError(f"{db_name} is on a network share, where WAL is unsafe; "
+                             "use the default profile")
+        self._journal_warned = False
+        self._idle = LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _open(self):
+        # Connections move between threads through the pool, but only one
+        # thread uses a given connection at a time.
+        conn = self.connect(self.db_name, check_same_thread=False)
+        try:
+            self._apply_pragmas(conn)
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _apply_pragmas(self, conn):
+        # busy_timeout first so switching the journal mode waits for locks
+        pragmas = dict(self.pragmas)
+        busy_timeout = pragmas.pop("busy_timeout", None)
+        if busy_timeout is not None:
+            conn.execute(f'PRAGMA busy_timeout = {int(busy_timeout)}')
+        for name, value in pragmas.items():
+            if not name.isidentifier():
+                raise ValueError(f"Invalid PRAGMA name: {name}")
+            if isinstance(value, str) and not value.isalnum():
+                raise ValueError(f"Invalid value for PRAGMA {name}: {value}")
+            try:
+                conn.execute(f'PRAGMA {name} = {value}').fetchall()
+            except sqlite3.OperationalError as e:
+                # A WAL file can only leave WAL once no other connection
+                # has it open; keep working in WAL until then
+                if name != "journal_mode" or not is_busy_error(e):
+                    raise
+                if not self._journal_warned:
+                    self._journal_warned = True
+                    print(f"Journal mode stays {self.journal_mode(conn)} while other "
+                          f"connections use {self.db_name}")
+
+    @staticmethod
+    def journal_mode(conn):
+        return conn.execute('PRAGMA journal_mode').fetchone()[0]
+
+    def _is_healthy(self, conn):
+        try:
+            # A plain cursor, so query metrics don't count the check
+            conn.cursor(sqlite3.Cursor).execute('SELECT 1').fetchone()
+            return not conn.in_transaction
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, conn):
+        with self._lock:
+            self._created -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def checkout(self):
+        """Take a connection from the pool, opening one if allowed"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                conn = None
+                with self._lock:
+                    if self._created < self.max_size:
+                        self._created += 1
+                        create = True
+                    else:
+                        create = False
+                if create:
+                    try:
+                        return self._open()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except Empty:
+                    raise PoolTimeoutError(
+                        f"No database connection available after {self.timeout}s")
+
+            if self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def checkin(self, conn):
+        """Return a connection to the pool"""
+        if self._closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; commit on success, roll back on error"""
+        conn = self.checkout()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        finally:
+            self.checkin(conn)
+
+    def close(self):
+        """Close all idle connections and refuse further checkouts"""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(conn)
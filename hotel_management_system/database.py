@@ -1,283 +1,685 @@
 import sqlite3
 import os
+import threading
+import functools
+import itertools
+import operator
+import re
 from datetime import datetime
 
+from connection_pool import ConnectionPool, RetryPolicy
+from instrumentation import QueryMetrics
+from migrations import migrate
+from query_builder import QueryBuilder
+from query_cache import QueryCache, cached
+from records import (FAULT_COLUMNS, MENU_COLUMNS, SHIFT_COLUMNS, SPECIAL_SERVICE_COLUMNS,
+                     CocktailRecipe, Fault, Menu, Shift, SpecialService, select_list,
+                     to_record, to_records)
+
+# Fault list filters: name -> (column, operator). A list of values for an
+# "=" filter matches any of them.
+FAULT_FILTERS = {
+    'status': ('fault_status', '='),
+    'room_number': ('room_number', '='),
+    'reporter': ('reporter', '='),
+    'date_from': ('date', '>='),
+    'date_to': ('date', '<='),
+}
+
+_COMPARISONS = {'=': operator.eq, '>=': operator.ge, '<=': operator.le}
+
+# Shared instances keyed by absolute database path, see get_database()
+_instances = {}
+_instances_lock = threading.Lock()
+
+# Database files whose schema has already been initialised in this process
+_initialized_paths = set()
+_schema_lock = threading.Lock()
+
+def get_database(db_name="hotel.db"):
+    """Return the process-wide HotelDatabase for db_name, creating it once"""
+    key = os.path.abspath(db_name)
+    with _instances_lock:
+        db = _instances.get(key)
+        if db is None:
+            db = HotelDatabase(db_name)
+            _instances[key] = db
+        return db
+
+def db_operation(error_message, default=None):
+    """Retry a HotelDatabase method on SQLITE_BUSY, then report and fall back.
+    
+    ``default`` is returned when the operation still fails; pass a callable
+    such as ``list`` to get a fresh value each time. Callers that must tell
+    a failure from an empty result pass ``raise_errors=True`` to get the
+    sqlite3.Error instead. Every call is timed in ``self.metrics`` (see
+    instrumentation.py).
+    """
+    def decorator(method):
+        name = method.__name__
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, raise_errors=False, **kwargs):
+            with self.metrics.operation(name) as operation:
+                try:
+                    return self.retry_policy.call(method, self, *args, **kwargs)
+                except sqlite3.Error as e:
+                    operation.failed = True
+                    if raise_errors:
+                        raise
+                    print(f"{error_message}: {e}")
+                    return default() if callable(default) else default
+        return wrapper
+    return decorator
+
+def fold_search_text(text):
+    """Fold text the way the search index does (see migrations.fold_sql)"""
+    return text.replace('ı', 'i')
+
+def build_match_query(text):
+    """FTS5 query matching rows that contain every word of ``text`` as a prefix.
+    
+    Words are quoted so characters such as ``-`` or ``"`` typed by the user
+    are never read as query syntax. Returns None if there is nothing to match.
+    """
+    words = re.findall(r'\w+', fold_search_text(text))
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+def fault_sort_key(column):
+    """Columns a fault list sorted by ``column`` is ordered by.
+    
+    Ties are broken by date and then id, so each order is total and
+    matches one of the (column, date) indexes from migrations.py.
+    """
+    if column == 'id':
+        return ('id',)
+    if column == 'date':
+        return ('date', 'id')
+    return (column, 'date', 'id')
+
+def _active_filters(filters):
+    for name, value in (filters or {}).items():
+        if name not in FAULT_FILTERS:
+            raise ValueError(f"Unknown fault filter: {name}")
+        if value is not None and value != '':
+            yield FAULT_FILTERS[name], value
+
+def fault_query(filters=None, sort='date', descending=True):
+    """QueryBuilder for the faults passing ``filters``, sorted by ``sort``"""
+    query = QueryBuilder('faults', FAULT_COLUMNS)
+    for (column, op), value in _active_filters(filters):
+        if op == '=' and isinstance(value, (list, tuple, set)):
+            query.where(column, 'IN', value)
+        else:
+            query.where(column, op, value)
+    return query.order_by(*fault_sort_key(sort), descending=descending)
+
+def fault_matches(fault, filters):
+    """True if a Fault passes ``filters``, checked in Python"""
+    for (column, op), value in _active_filters(filters):
+        field = getattr(fault, column)
+        if op == '=' and isinstance(value, (list, tuple, set)):
+            if field not in value:
+                return False
+        elif not _COMPARISONS[op](field, value):
+            return False
+    return True
+
 class HotelDatabase:
-    def __init__(self, db_name="hotel.db"):
+    def __init__(self, db_name="hotel.db", pool_size=4, profile=None, retry_policy=None,
+                 cache=True, metrics=None):
         self.db_name = db_name
-        self.init_db()
+        # profile: name from connection_pool.PROFILES or a dict of PRAGMAs
+        if profile is None:
+            profile = os.environ.get("HOTEL_DB_PROFILE", "default")
+        # Timings, slow-query log and metrics export, see instrumentation.py
+        self.metrics = metrics or QueryMetrics()
+        self.pool = ConnectionPool(db_name, max_size=pool_size, pragmas=profile,
+                                   connect=self.metrics.connect)
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Open a pooled connection first: the journal mode can only change
+        # while no other connection, such as the cache's, has the file open
+        try:
+            with self.get_connection():
+                pass
+        except sqlite3.Error:
+            pass  # init_db() reports it
+        # Read-through cache for the F&B lookups, see query_cache.py
+        self.cache = QueryCache(db_name) if cache else None
+        self.ensure_schema()
     
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_name)
+        """Borrow a pooled database connection (use as a context manager)"""
+        return self.pool.connection()
+    
+    def close(self):
+        """Close all pooled connections"""
+        self.pool.close()
+        if self.cache is not None:
+            self.cache.close()
+    
+    def _invalidate(self, *tables):
+        """Drop cached reads of tables this process has just written"""
+        if self.cache is not None:
+            self.cache.invalidate(*tables)
+    
+    def _upsert(self, conn, table, row, key_columns=('date',)):
+        """Insert row or update the existing one in a single statement.
+        
+        ``key_columns`` must be covered by a UNIQUE index on ``table``
+        (see migrations.py); every other column in ``row`` is overwritten.
+        """
+        columns = list(row)
+        updates = [c for c in columns if c not in key_columns]
+        sql = (
+            f'INSERT INTO {table} ({", ".join(columns)}) '
+            f'VALUES ({", ".join("?" for _ in columns)}) '
+            f'ON CONFLICT ({", ".join(key_columns)}) DO '
+        )
+        if updates:
+            sql += 'UPDATE SET ' + ', '.join(f'{c} = excluded.{c}' for c in updates)
+        else:
+            sql += 'NOTHING'
+        return conn.execute(sql, [row[c] for c in columns])
+    
+    def _insert_many(self, table, columns, rows, batch_size=1000, progress=None):
+        """Insert rows with executemany, all in one transaction.
+        
+        ``rows`` may be any iterable and is consumed ``batch_size`` rows at
+        a time, so a large import never sits in memory as a whole. The
+        write lock is taken before the first row is read: a busy database
+        is retried there, never halfway through a consumed iterator.
+        ``progress`` is called with the running total after each batch.
+        Returns the number of rows inserted; nothing is kept on error.
+        """
+        sql = (f'INSERT INTO {table} ({", ".join(columns)}) '
+               f'VALUES ({", ".join("?" for _ in columns)})')
+        rows = iter(rows)
+        inserted = 0
+        with self.get_connection() as conn:
+            self.retry_policy.call(conn.execute, 'BEGIN IMMEDIATE')
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                conn.executemany(sql, batch)
+                inserted += len(batch)
+                if progress is not None:
+                    progress(inserted)
+        return inserted
+    
+    def _add_bulk(self, name, table, columns, rows, batch_size, progress, raise_errors):
+        """_insert_many() timed as operation ``name``; 0 on error unless ``raise_errors``"""
+        with self.metrics.operation(name) as operation:
+            try:
+                inserted = self._insert_many(table, columns, rows, batch_size, progress)
+            except sqlite3.Error as e:
+                operation.failed = True
+                if raise_errors:
+                    raise
+                print(f"Error adding {table.replace('_', ' ')}: {e}")
+                return 0
+        if self.cache is not None and table in self.cache.tables:
+            self._invalidate(table)
+        return inserted
+    
+    def ensure_schema(self):
+        """Run init_db() unless this process already initialised the file"""
+        key = os.path.abspath(self.db_name)
+        with _schema_lock:
+            if key in _initialized_paths:
+                return True
+            if self.init_db():
+                _initialized_paths.add(key)
+                return True
+            return False
     
     def init_db(self):
         """Initialize database and create tables"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Create Faults table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS faults (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    room_number TEXT NOT NULL,
-                    reporter TEXT NOT NULL,
-                    fault_description TEXT NOT NULL,
-                    fault_status TEXT NOT NULL DEFAULT 'Bekleniyor'
-                )
-            ''')
-            
-            # Create Shifts table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS shifts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    working_staff TEXT,
-                    on_leave TEXT,
-                    cover_color TEXT
-                )
-            ''')
-            
-            # Create Special Services table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS special_services (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    service_description TEXT NOT NULL,
-                    status TEXT DEFAULT 'Beklemede'
-                )
-            ''')
-            
-            # Create Menus table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS menus (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    food_menu TEXT NOT NULL
-                )
-            ''')
-            
-            # Create Cocktail Recipes table (static data)
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cocktail_recipes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    recipe TEXT NOT NULL,
-                    ingredients TEXT NOT NULL
-                )
-            ''')
-            
-            conn.commit()
-            
-            # Insert sample cocktail recipes if table is empty
-            cursor.execute('SELECT COUNT(*) FROM cocktail_recipes')
-            if cursor.fetchone()[0] == 0:
-                sample_cocktails = [
-                    ("Mojito", "Nane yaprakları, lime, şeker, rom, soda", "10 nane yaprağı, 1/2 lime, 2 tsp şeker, 60ml beyaz rom, soda"),
-                    ("Piña Colada", "Ananas suyu, hindistan cevizi kremi, rom", "90ml ananas suyu, 30ml hindistan cevizi kremi, 60ml beyaz rom, buz"),
-                    ("Margarita", "Tequila, lime suyu, triple sec", "60ml tequila, 30ml lime suyu, 30ml triple sec, tuz kenarı"),
-                    ("Cosmopolitan", "Vodka, cranberry suyu, lime suyu, triple sec", "45ml vodka, 15ml cranberry suyu, 15ml lime suyu, 15ml triple sec")
-                ]
-                cursor.executemany('INSERT INTO cocktail_recipes (name, recipe, ingredients) VALUES (?, ?, ?)', sample_cocktails)
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Create Faults table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS faults (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        date TEXT NOT NULL,
+                        room_number TEXT NOT NULL,
+                        reporter TEXT NOT NULL,
+                        fault_description TEXT NOT NULL,
+                        fault_status TEXT NOT NULL DEFAULT 'Bekleniyor'
+                    )
+                ''')
+                
+                # Create Shifts table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS shifts (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        date TEXT NOT NULL,
+                        working_staff TEXT,
+                        on_leave TEXT,
+                        cover_color TEXT
+                    )
+                ''')
+                
+                # Create Special Services table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS special_services (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        date TEXT NOT NULL,
+                        service_description TEXT NOT NULL,
+                        status TEXT DEFAULT 'Beklemede'
+                    )
+                ''')
+                
+                # Create Menus table
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS menus (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        date TEXT NOT NULL,
+                        food_menu TEXT NOT NULL
+                    )
+                ''')
+                
+                # Create Cocktail Recipes table (static data)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS cocktail_recipes (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        recipe TEXT NOT NULL,
+                        ingredients TEXT NOT NULL
+                    )
+                ''')
+                
                 conn.commit()
+                
+                # Insert sample cocktail recipes if table is empty
+                cursor.execute('SELECT COUNT(*) FROM cocktail_recipes')
+                if cursor.fetchone()[0] == 0:
+                    sample_cocktails = [
+                        ("Mojito", "Nane yaprakları, lime, şeker, rom, soda", "10 nane yaprağı, 1/2 lime, 2 tsp şeker, 60ml beyaz rom, soda"),
+                        ("Piña Colada", "Ananas suyu, hindistan cevizi kremi, rom", "90ml ananas suyu, 30ml hindistan cevizi kremi, 60ml beyaz rom, buz"),
+                        ("Margarita", "Tequila, lime suyu, triple sec", "60ml tequila, 30ml lime suyu, 30ml triple sec, tuz kenarı"),
+                        ("Cosmopolitan", "Vodka, cranberry suyu, lime suyu, triple sec", "45ml vodka, 15ml cranberry suyu, 15ml lime suyu, 15ml triple sec")
+                    ]
+                    cursor.executemany('INSERT INTO cocktail_recipes (name, recipe, ingredients) VALUES (?, ?, ?)', sample_cocktails)
+                    conn.commit()
+                
+                # Bring indexes and constraints of older files up to date
+                migrate(conn)
             
-            conn.close()
             print("Database initialized successfully")
-            
+            return True
+        
         except sqlite3.Error as e:
             print(f"Database initialization error: {e}")
+            return False
     
     # Fault Management Functions
+    @db_operation("Error getting pending faults", default=list)
     def get_pending_faults(self):
         """Get all pending faults"""
-        try:
-            conn = self.get_connection()
+        with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM faults WHERE fault_status = "Bekleniyor" ORDER BY date DESC')
-            faults = cursor.fetchall()
-            conn.close()
-            return faults
-        except sqlite3.Error as e:
-            print(f"Error getting pending faults: {e}")
-            return []
+            cursor.execute(f'SELECT {select_list(Fault)} FROM faults '
+                           'WHERE fault_status = "Bekleniyor" ORDER BY date DESC')
+            return to_records(Fault, cursor.fetchall())
     
-    def get_all_faults(self):
-        """Get all faults"""
-        try:
-            conn = self.get_connection()
+    @db_operation("Error getting all faults", default=list)
+    def get_all_faults(self, include_archive=False):
+        """Get all faults, with include_archive also those moved to archive.py's files"""
+        with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM faults ORDER BY date DESC')
-            faults = cursor.fetchall()
-            conn.close()
-            return faults
+            cursor.execute(f'SELECT {select_list(Fault)} FROM faults ORDER BY date DESC')
+            faults = to_records(Fault, cursor.fetchall())
+        if include_archive:
+            from archive import read_archived_faults
+            live_ids = {fault.id for fault in faults}
+            faults.extend(fault for fault in read_archived_faults(self) if fault.id not in live_ids)
+            faults.sort(key=lambda fault: fault.date, reverse=True)
+        return faults
+    
+    @db_operation("Error getting faults page", default=lambda: ([], None))
+    def get_faults_page(self, page_size=100, cursor=None, status=None, filters=None,
+                        sort='date', descending=True):
+        """Get one page of faults, newest first unless ``sort`` says otherwise.
+        
+        ``filters`` maps names from FAULT_FILTERS to values; ``status`` is
+        a shorthand for the status filter. ``cursor`` is the sort key of the
+        last row of the previous page (see fault_sort_key). Returns
+        ``(faults, next_cursor)``; ``next_cursor`` is None on the last page.
+        Keyset pagination keeps every page an index range scan, however
+        deep the caller pages.
+        """
+        filters = dict(filters or {})
+        if status is not None:
+            filters['status'] = status
+        query = fault_query(filters, sort, descending)
+        if cursor is not None:
+            query.after(cursor)
+        sql, params = query.limit(page_size + 1).select()
+        
+        with self.get_connection() as conn:
+            faults = to_records(Fault, conn.execute(sql, params).fetchall())
+        
+        if len(faults) > page_size:
+            faults = faults[:page_size]
+            return faults, query.sort_key(faults[-1])
+        return faults, None
+    
+    @db_operation("Error counting faults", default=0)
+    def count_faults(self, status=None, filters=None):
+        """Count faults, optionally only those with the given status or filters"""
+        filters = dict(filters or {})
+        if status is not None:
+            filters['status'] = status
+        sql, params = fault_query(filters).count()
+        with self.get_connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+    
+    def iter_faults(self, status=None, batch_size=500, filters=None, sort='date', descending=True):
+        """Yield faults newest first, fetching ``batch_size`` rows at a time.
+        
+        Takes the same filters and sort order as get_faults_page(). A pooled
+        connection is held until the generator is exhausted or closed, so
+        consume it promptly.
+        """
+        filters = dict(filters or {})
+        if status is not None:
+            filters['status'] = status
+        sql, params = fault_query(filters, sort, descending).select()
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(sql, params)
+                try:
+                    while True:
+                        rows = cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        yield from to_records(Fault, rows)
+                finally:
+                    cursor.close()
         except sqlite3.Error as e:
-            print(f"Error getting all faults: {e}")
-            return []
+            print(f"Error iterating faults: {e}")
     
+    @db_operation("Error adding fault", default=False)
     def add_fault(self, date, room_number, reporter, fault_description, fault_status="Bekleniyor"):
-        """Add new fault"""
-        try:
-            conn = self.get_connection()
+        """Add new fault, return its id"""
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO faults (date, room_number, reporter, fault_description, fault_status)
                 VALUES (?, ?, ?, ?, ?)
             ''', (date, room_number, reporter, fault_description, fault_status))
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error adding fault: {e}")
-            return False
+            return cursor.lastrowid
     
+    @db_operation("Error updating fault status")
     def update_fault_status(self, fault_id, new_status):
-        """Update fault status"""
-        try:
-            conn = self.get_connection()
+        """Update fault status, return the number of rows changed (None on error).
+        
+        Triggers record the change in fault_status_history and, for
+        "Çözüldü", the resolution time used by fault_stats.py.
+        """
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('UPDATE faults SET fault_status = ? WHERE id = ?', (new_status, fault_id))
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error updating fault status: {e}")
-            return False
+            return cursor.rowcount
     
-    def get_fault_by_id(self, fault_id):
-        """Get specific fault by ID"""
-        try:
-            conn = self.get_connection()
+    def add_faults_bulk(self, faults, batch_size=1000, progress=None, raise_errors=False):
+        """Add many faults in a single transaction, return how many were added.
+        
+        Each fault is ``(date, room_number, reporter, fault_description)``
+        with an optional fifth ``fault_status`` (default "Bekleniyor").
+        A failed transaction returns 0, or raises with ``raise_errors``.
+        """
+        rows = (tuple(fault) if len(fault) == 5 else tuple(fault) + ("Bekleniyor",)
+                for fault in faults)
+        return self._add_bulk('add_faults_bulk', 'faults', FAULT_COLUMNS[1:], rows,
+                              batch_size, progress, raise_errors)
+    
+    @db_operation("Error getting fault by ID")
+    def get_fault_by_id(self, fault_id, include_archive=False):
+        """Get specific fault by ID, looking in the archives too if asked"""
+        with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM faults WHERE id = ?', (fault_id,))
-            fault = cursor.fetchone()
-            conn.close()
-            return fault
-        except sqlite3.Error as e:
-            print(f"Error getting fault by ID: {e}")
-            return None
+            cursor.execute(f'SELECT {select_list(Fault)} FROM faults WHERE id = ?', (fault_id,))
+            fault = to_record(Fault, cursor.fetchone())
+        if fault is None and include_archive:
+            from archive import read_archived_faults
+            archived = read_archived_faults(self, fault_id)
+            fault = archived[0] if archived else None
+        return fault
+    
+    def _search(self, table, record, status_column, query, status=None, date_range=None,
+                limit=100, weights=(), filters=(), order=None, descending=True, exact=None):
+        match = build_match_query(query)
+        if match is None:
+            return []
+        conditions = [f'{table}_fts MATCH ?']
+        params = [match]
+        if status is not None:
+            conditions.append(f't.{status_column} = ?')
+            params.append(status)
+        if date_range is not None:
+            start, end = date_range
+            if start:
+                conditions.append('t.date >= ?')
+                params.append(start)
+            if end:
+                conditions.append('t.date <= ?')
+                params.append(end)
+        for (column, op), value in filters:
+            if op == '=' and isinstance(value, (list, tuple, set)):
+                conditions.append(f't.{column} IN ({", ".join("?" for _ in value)})')
+                params.extend(value)
+            else:
+                conditions.append(f't.{column} {op} ?')
+                params.append(value)
+        if order:
+            direction = ' DESC' if descending else ''
+            for column in order:
+                if column not in record._fields:
+                    raise ValueError(f"Unknown column for {table}: {column}")
+            order_by = ', '.join(f't.{column}{direction}' for column in order)
+        else:
+            rank = f"bm25({', '.join([f'{table}_fts'] + [str(w) for w in weights])})"
+            order_by = f'{rank}, t.date DESC, t.id DESC'
+            if exact:
+                # Rows where ``exact`` equals a whole query word come first;
+                # prefix matching alone can rank room 1015 above 101 for "101"
+                words = re.findall(r'\w+', query)
+                order_by = (f't.{exact} COLLATE NOCASE IN ({", ".join("?" for _ in words)}) DESC, '
+                            + order_by)
+                params.extend(words)
+        with self.get_connection() as conn:
+            return to_records(record, conn.execute(f'''
+                SELECT {select_list(record, 't')}
+                FROM {table}_fts JOIN {table} t ON t.id = {table}_fts.rowid
+                WHERE {' AND '.join(conditions)}
+                ORDER BY {order_by} LIMIT ?
+            ''', params + [limit]).fetchall())
+    
+    @db_operation("Error searching faults", default=list)
+    def search_faults(self, query, status=None, date_range=None, limit=100, filters=None,
+                      sort=None, descending=True):
+        """Faults whose room, reporter or description match ``query``, best first.
+        
+        Matching ignores case and Turkish diacritics ("klima" finds "KLİMA",
+        "isik" finds "ışık") and treats each word as a prefix. ``date_range``
+        is ``(start, end)`` in YYYY-MM-DD, either end may be None. A room
+        number equal to a query word ranks first, then prefix matches on
+        the room above description matches. ``filters`` narrows
+        the results like it does for get_faults_page(); a ``sort`` column
+        orders them by that column instead of by relevance.
+        """
+        return self._search('faults', Fault, 'fault_status', query, status,
+                            date_range, limit, weights=(10.0, 0.5, 1.0),
+                            filters=list(_active_filters(filters)),
+                            order=fault_sort_key(sort) if sort else None,
+                            descending=descending, exact='room_number')
     
     # Shift Management Functions
+    @db_operation("Error getting today's shift")
+    @cached("shifts")
     def get_today_shift(self):
         """Get today's shift information"""
         today = datetime.now().strftime('%Y-%m-%d')
-        try:
-            conn = self.get_connection()
+        with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM shifts WHERE date = ?', (today,))
-            shift = cursor.fetchone()
-            conn.close()
-            return shift
-        except sqlite3.Error as e:
-            print(f"Error getting today's shift: {e}")
-            return None
+            cursor.execute(f'SELECT {select_list(Shift)} FROM shifts WHERE date = ?', (today,))
+            return to_record(Shift, cursor.fetchone())
     
+    @db_operation("Error updating shift", default=False)
     def update_shift(self, date, working_staff, on_leave, cover_color):
         """Update or insert shift information"""
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Check if shift exists for this date
-            cursor.execute('SELECT id FROM shifts WHERE date = ?', (date,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                cursor.execute('''
-                    UPDATE shifts SET working_staff = ?, on_leave = ?, cover_color = ?
-                    WHERE date = ?
-                ''', (working_staff, on_leave, cover_color, date))
-            else:
-                cursor.execute('''
-                    INSERT INTO shifts (date, working_staff, on_leave, cover_color)
-                    VALUES (?, ?, ?, ?)
-                ''', (date, working_staff, on_leave, cover_color))
-            
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error updating shift: {e}")
-            return False
+        with self.get_connection() as conn:
+            self._upsert(conn, 'shifts', {
+                'date': date,
+                'working_staff': working_staff,
+                'on_leave': on_leave,
+                'cover_color': cover_color,
+            })
+        self._invalidate('shifts')
+        return True
+    
+    def add_shifts_bulk(self, shifts, batch_size=1000, progress=None, raise_errors=False):
+        """Add many days of ``(date, working_staff, on_leave, cover_color)`` at once.
+        
+        Dates must not have a shift yet. Returns how many were added; a
+        failed transaction returns 0, or raises with ``raise_errors``.
+        """
+        return self._add_bulk('add_shifts_bulk', 'shifts', SHIFT_COLUMNS[1:], shifts,
+                              batch_size, progress, raise_errors)
     
     # Special Services Functions
+    @db_operation("Error getting today's special services", default=list)
+    @cached("special_services")
     def get_today_special_services(self):
         """Get today's special services"""
         today = datetime.now().strftime('%Y-%m-%d')
-        try:
-            conn = self.get_connection()
+        with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM special_services WHERE date = ? ORDER BY id DESC', (today,))
-            services = cursor.fetchall()
-            conn.close()
-            return services
-        except sqlite3.Error as e:
-            print(f"Error getting today's special services: {e}")
-            return []
+            cursor.execute(f'SELECT {select_list(SpecialService)} FROM special_services '
+                           'WHERE date = ? ORDER BY id DESC', (today,))
+            return to_records(SpecialService, cursor.fetchall())
     
+    @db_operation("Error adding special service", default=False)
     def add_special_service(self, date, service_description, status="Beklemede"):
-        """Add special service request"""
-        try:
-            conn = self.get_connection()
+        """Add special service request, return its id"""
+        with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
                 INSERT INTO special_services (date, service_description, status)
                 VALUES (?, ?, ?)
             ''', (date, service_description, status))
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error adding special service: {e}")
-            return False
+        self._invalidate('special_services')
+        return cursor.lastrowid
+    
+    def add_special_services_bulk(self, services, batch_size=1000, progress=None,
+                                  raise_errors=False):
+        """Add many special services in a single transaction.
+        
+        Each service is ``(date, service_description)`` with an optional
+        third ``status`` (default "Beklemede"). Returns how many were added;
+        a failed transaction returns 0, or raises with ``raise_errors``.
+        """
+        rows = (tuple(service) if len(service) == 3 else tuple(service) + ("Beklemede",)
+                for service in services)
+        return self._add_bulk('add_special_services_bulk', 'special_services',
+                              SPECIAL_SERVICE_COLUMNS[1:], rows, batch_size, progress,
+                              raise_errors)
+    
+    @db_operation("Error searching special services", default=list)
+    def search_special_services(self, query, status=None, date_range=None, limit=100):
+        """Special services whose description matches ``query``, best first"""
+        return self._search('special_services', SpecialService, 'status', query,
+                            status, date_range, limit)
     
     # Menu Management Functions
+    @db_operation("Error getting today's menu")
+    @cached("menus")
     def get_today_menu(self):
         """Get today's food menu"""
         today = datetime.now().strftime('%Y-%m-%d')
-        try:
-            conn = self.get_connection()
+        with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM menus WHERE date = ?', (today,))
-            menu = cursor.fetchone()
-            conn.close()
-            return menu
-        except sqlite3.Error as e:
-            print(f"Error getting today's menu: {e}")
-            return None
+            cursor.execute(f'SELECT {select_list(Menu)} FROM menus WHERE date = ?', (today,))
+            return to_record(Menu, cursor.fetchone())
     
+    @db_operation("Error updating menu", default=False)
     def update_menu(self, date, food_menu):
         """Update or insert daily menu"""
-        try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Check if menu exists for this date
-            cursor.execute('SELECT id FROM menus WHERE date = ?', (date,))
-            existing = cursor.fetchone()
-            
-            if existing:
-                cursor.execute('UPDATE menus SET food_menu = ? WHERE date = ?', (food_menu, date))
-            else:
-                cursor.execute('INSERT INTO menus (date, food_menu) VALUES (?, ?)', (date, food_menu))
-            
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error updating menu: {e}")
-            return False
+        with self.get_connection() as conn:
+            self._upsert(conn, 'menus', {'date': date, 'food_menu': food_menu})
+        self._invalidate('menus')
+        return True
     
+    def add_menus_bulk(self, menus, batch_size=1000, progress=None, raise_errors=False):
+        """Add many days of ``(date, food_menu)`` at once, like add_shifts_bulk()"""
+        return self._add_bulk('add_menus_bulk', 'menus', MENU_COLUMNS[1:], menus,
+                              batch_size, progress, raise_errors)
+    
+    @db_operation("Error getting cocktail recipes", default=list)
+    @cached("cocktail_recipes")
     def get_cocktail_recipes(self):
         """Get all cocktail recipes"""
-        try:
-            conn = self.get_connection()
+        with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM cocktail_recipes ORDER BY name')
-            recipes = cursor.fetchall()
-            conn.close()
-            return recipes
-        except sqlite3.Error as e:
-            print(f"Error getting cocktail recipes: {e}")
-            return []
+            cursor.execute(f'SELECT {select_list(CocktailRecipe)} FROM cocktail_recipes ORDER BY name')
+            return to_records(CocktailRecipe, cursor.fetchall())
+    
+    # Change Feed Functions
+    @db_operation("Error getting current revision", default=0)
+    def current_revision(self):
+        """Latest change_log revision, 0 if nothing has been recorded"""
+        with self.get_connection() as conn:
+            return conn.execute('SELECT COALESCE(MAX(revision), 0) FROM change_log').fetchone()[0]
+    
+    @db_operation("Error getting changes", default=list)
+    def changes_since(self, revision, limit=1000):
+        """Changes after ``revision``, oldest first.
+        
+        Each change is ``(revision, table_name, row_id, operation)`` with
+        operation one of insert/update/delete.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT revision, table_name, row_id, operation FROM change_log
+                WHERE revision > ? ORDER BY revision LIMIT ?
+            ''', (revision, limit))
+            return cursor.fetchall()
+    
+    @db_operation("Error pruning change log", default=0)
+    def prune_change_log(self, keep_days=30):
+        """Delete change_log entries older than ``keep_days`` days"""
+        with self.get_connection() as conn:
+            cursor = conn.execute("DELETE FROM change_log WHERE changed_at < datetime('now', ?)",
+                                  (f'-{int(keep_days)} days',))
+            return cursor.rowcount
+    
+    def _get_rows_by_ids(self, table, record, ids):
+        rows = []
+        ids = list(ids)
+        with self.get_connection() as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows.extend(to_records(record, conn.execute(
+                    f'SELECT {select_list(record)} FROM {table} '
+                    f'WHERE id IN ({", ".join("?" for _ in chunk)})', chunk).fetchall()))
+        return rows
+    
+    @db_operation("Error getting faults by ID", default=list)
+    def get_faults_by_ids(self, fault_ids):
+        """Get the faults with the given ids (missing ids are skipped)"""
+        return self._get_rows_by_ids('faults', Fault, fault_ids)
+    
+    @db_operation("Error getting special services by ID", default=list)
+    def get_special_services_by_ids(self, service_ids):
+        """Get the special services with the given ids"""
+        return self._get_rows_by_ids('special_services', SpecialService, service_ids)
@@ -0,0 +1,137 @@
+"""
+Background execution of database calls for the Qt widgets.
+
+Widgets submit work to a DatabaseTaskRunner under a channel name such as
+"faults" or "menu". Results and errors come back on the GUI thread via
+callbacks. Submitting on a channel cancels the request still pending
+there, so quickly switching views never shows stale data. Database calls
+are labelled with the class of the runner's parent widget in the query
+metrics (see instrumentation.py).
+"""
+
+import itertools
+
+import instrumentation
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+_thread_pool = None
+
+def database_thread_pool():
+    """Shared thread pool sized to the database connection pool"""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(4)
+    return _thread_pool
+
+class TaskSignals(QObject):
+    result = pyqtSignal(int, object)
+    error = pyqtSignal(int, str)
+    finished = pyqtSignal(int)
+
+class DatabaseTask(QRunnable):
+    """Runs one database call on a pool thread"""
+    
+    def __init__(self, task_id, func, args, kwargs, screen=None):
+        super().__init__()
+        self.task_id = task_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.screen = screen
+        self.cancelled = False
+        self.signals = TaskSignals()
+        # The runner keeps the Python object alive until "finished"
+        self.setAutoDelete(False)
+    
+    def run(self):
+        try:
+            if self.cancelled:
+                return
+            try:
+                with instrumentation.screen(self.screen):
+                    result = self.func(*self.args, **self.kwargs)
+            except Exception as e:
+                if not self.cancelled:
+                    self.signals.error.emit(self.task_id, str(e))
+                return
+            if not self.cancelled:
+                self.signals.result.emit(self.task_id, result)
+        finally:
+            self.signals.finished.emit(self.task_id)
+
+class DatabaseTaskRunner(QObject):
+    """Submits database calls to the thread pool, one live call per channel"""
+    
+    _ids = itertools.count(1)
+    
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or database_thread_pool()
+        self.screen = type(parent).__name__ if parent is not None else None
+        self._tasks = {}     # task id -> (channel, task, on_result, on_error)
+        self._channels = {}  # channel -> task id
+        self._alive = {}     # task id -> task, until the pool is done with it
+    
+    def submit(self, channel, func, *args, on_result=None, on_error=None, **kwargs):
+        """Run func(*args, **kwargs) in the background and return the task id"""
+        self.cancel(channel)
+        task_id = next(self._ids)
+        task = DatabaseTask(task_id, func, args, kwargs, self.screen)
+        task.signals.result.connect(self._on_result)
+        task.signals.error.connect(self._on_error)
+        task.signals.finished.connect(self._on_finished)
+        self._tasks[task_id] = (channel, task, on_result, on_error)
+        self._channels[channel] = task_id
+        self._alive[task_id] = task
+        self.pool.start(task)
+        return task_id
+    
+    def cancel(self, channel):
+        """Drop the pending call on a channel; a running call's result is ignored"""
+        task_id = self._channels.pop(channel, None)
+        if task_id is None:
+            return
+        entry = self._tasks.pop(task_id, None)
+        if entry:
+            task = entry[1]
+            task.cancelled = True
+            if self.pool.tryTake(task):
+                self._alive.pop(task_id, None)
+    
+    def cancel_all(self):
+        for channel in list(self._channels):
+            self.cancel(channel)
+    
+    def is_busy(self, channel):
+        return channel in self._channels
+    
+    def _finish(self, task_id):
+        entry = self._tasks.pop(task_id, None)
+        if entry is None:
+            return None
+        channel = entry[0]
+        if self._channels.get(channel) == task_id:
+            del self._channels[channel]
+        return entry
+    
+    @pyqtSlot(int, object)
+    def _on_result(self, task_id, result):
+        entry = self._finish(task_id)
+        if entry and entry[2]:
+            entry[2](result)
+    
+    @pyqtSlot(int)
+    def _on_finished(self, task_id):
+        self._alive.pop(task_id, None)
+    
+    @pyqtSlot(int, str)
+    def _on_error(self, task_id, message):
+        entry = self._finish(task_id)
+        if entry is None:
+            return
+        if entry[3]:
+            entry[3](message)
+        else:
+            print(f"Background database task failed: {message}")
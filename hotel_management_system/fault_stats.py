@@ -0,0 +1,86 @@
+"""
+Fault statistics from the counters kept by the database triggers
+
+Migration 7 adds summary tables that triggers on ``faults`` keep up to
+date on every insert, status change and delete, whichever terminal or
+tool made it: ``fault_counts`` (faults per status, per reporter, per
+floor and per day, each split by status), ``fault_timestamps`` (when a
+fault was reported and resolved) and ``fault_resolution_totals`` (running
+sum for the mean time to resolution). Reading the statistics therefore
+never scans the faults themselves, however many there are.
+
+Statistics cover the live ``faults`` table: archived faults are no
+longer counted. Faults reported before migration 7 count from their
+report date (migration 8); those that were already resolved by then have
+no resolution time and are left out of the mean.
+"""
+
+from datetime import datetime, timedelta
+
+from database import db_operation
+
+OPEN_STATUS = "Bekleniyor"
+
+def _counts(conn, dimension, status=None, since=None):
+    """{key: count} for one dimension, for one status or all of them"""
+    sql = 'SELECT key, SUM(count) FROM fault_counts WHERE dimension = ?'
+    params = [dimension]
+    if status is not None:
+        sql += ' AND status = ?'
+        params.append(status)
+    if since is not None:
+        sql += ' AND key >= ?'
+        params.append(since)
+    sql += ' GROUP BY key HAVING SUM(count) > 0 ORDER BY key'
+    return dict(conn.execute(sql, params).fetchall())
+
+@db_operation("Error getting fault statistics", default=dict)
+def fault_stats(db, days=14, today=None):
+    """Dashboard figures for the faults in the database.
+    
+    Returns a dict with ``by_status`` ({status: count}), ``open_by_floor``,
+    ``open_by_reporter`` and ``by_reporter`` ({key: count}), ``per_day``
+    ({date: count} for the last ``days`` days that have faults),
+    ``resolved_count`` and ``mean_time_to_resolution`` (seconds, None when
+    no resolution has been recorded yet).
+    """
+    today = today or datetime.now().date()
+    since = (today - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    with db.get_connection() as conn:
+        by_status = dict(conn.execute('''
+            SELECT status, count FROM fault_counts
+            WHERE dimension = 'status' AND count > 0 ORDER BY status
+        ''').fetchall())
+        resolved, total_seconds = conn.execute(
+            'SELECT resolved, total_seconds FROM fault_resolution_totals WHERE id = 1').fetchone()
+        return {
+            "by_status": by_status,
+            "open_by_floor": _counts(conn, 'floor', OPEN_STATUS),
+            "open_by_reporter": _counts(conn, 'reporter', OPEN_STATUS),
+            "by_reporter": _counts(conn, 'reporter'),
+            "per_day": _counts(conn, 'day', since=since),
+            "resolved_count": resolved,
+            "mean_time_to_resolution": total_seconds / resolved if resolved else None,
+        }
+
+@db_operation("Error getting fault status history", default=list)
+def status_history(db, fault_id):
+    """Status changes of one fault, oldest first, as ``(status, changed_at)``"""
+    with db.get_connection() as conn:
+        return conn.execute('''
+            SELECT status, changed_at FROM fault_status_history
+            WHERE fault_id = ? ORDER BY id
+        ''', (fault_id,)).fetchall()
+
+def format_duration(seconds):
+    """Human-readable duration in Turkish, e.g. "1 gün 3 sa" or "42 dk" """
+    if seconds is None:
+        return "-"
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days} gün {hours} sa"
+    if hours:
+        return f"{hours} sa {minutes} dk"
+    return f"{minutes} dk"
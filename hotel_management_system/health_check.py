@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Fast in-process database health check used by the launcher
+
+Checks that the schema is not newer than this version understands,
+that SQLite's quick_check passes and that the file can be locked for
+writing. The file is opened with a plain connection, so the check never
+migrates it: an older schema is left for the application to upgrade
+when it starts. The schema and write-lock checks are cheap and run every
+time; only a passing quick_check is cached next to the database, and
+reused for as long as the size and modification time of the file and
+its ``-wal`` file are unchanged.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from migrations import LATEST_VERSION, get_schema_version
+
+def cache_path(db_name):
+    return f"{db_name}.health.json"
+
+def _file_signature(db_name):
+    # Under WAL, commits land in the -wal file until a checkpoint
+    signature = {}
+    for suffix in ("", "-wal"):
+        try:
+            stat = os.stat(db_name + suffix)
+        except FileNotFoundError:
+            continue
+        signature[suffix or "db"] = {"mtime": stat.st_mtime, "size": stat.st_size}
+    return signature
+
+def _load_cache(db_name):
+    try:
+        with open(cache_path(db_name), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_cache(db_name, result):
+    try:
+        with open(cache_path(db_name), "w", encoding="utf-8") as f:
+            json.dump(result, f)
+    except OSError:
+        pass  # caching is an optimisation only
+
+def run_checks(conn, quick_check=True):
+    """Run the checks on an open sqlite3 connection, return a list of problems"""
+    problems = []
+    version = get_schema_version(conn)
+    if version > LATEST_VERSION:
+        problems.append(f"schema version {version} is newer than {LATEST_VERSION}")
+    
+    if quick_check:
+        result = conn.execute('PRAGMA quick_check').fetchone()[0]
+        if result != "ok":
+            problems.append(f"quick_check: {result}")
+    
+    # Take and release the write lock without changing anything; this also
+    # notices a file made read-only, which leaves its mtime alone
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.rollback()
+    except sqlite3.OperationalError as e:
+        problems.append(f"not writable: {e}")
+    return problems
+
+def check_database(db_name="hotel.db", use_cache=True):
+    """Return (ok, problems, cached); ``cached`` means quick_check was skipped"""
+    if not os.path.exists(db_name):
+        # Nothing to check; the application creates the database on start
+        return True, [], False
+    cached = False
+    if use_cache:
+        entry = _load_cache(db_name)
+        cached = bool(entry and entry.get("ok") and entry.get("file") == _file_signature(db_name))
+    
+    # Closed before the file signature is recorded, so a WAL checkpoint
+    # on close does not change it afterwards
+    conn = None
+    try:
+        conn = sqlite3.connect(db_name, timeout=5.0, isolation_level=None)
+        problems = run_checks(conn, quick_check=not cached)
+    except sqlite3.Error as e:
+        problems = [str(e)]
+    finally:
+        if conn is not None:
+            conn.close()
+    
+    ok = not problems
+    if ok and not cached:
+        _save_cache(db_name, {"ok": True, "file": _file_signature(db_name),
+                              "checked_at": time.time()})
+    return ok, problems, cached
+
+if __name__ == "__main__":
+    names = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    name = names[0] if names else "hotel.db"
+    ok, problems, cached = check_database(name, use_cache="--no-cache" not in sys.argv)
+    if ok:
+        print(f"✅ {name} is healthy" + (" (quick_check cached)" if cached else ""))
+    else:
+        for problem in problems:
+            print(f"❌ {problem}")
+    sys.exit(0 if ok else 1)
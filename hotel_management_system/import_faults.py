@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Bulk import of faults or special services from CSV or JSON-lines files
+
+The file is streamed and written in batches inside one transaction, so a
+failed import leaves the database unchanged. Column names follow the
+database: date, room_number, reporter, fault_description and optionally
+fault_status for faults; date, service_description and optionally status
+for special services. Records that are not objects, lack a required
+field or have a status the screens do not know are skipped and reported.
+
+Usage: python import_faults.py FILE [--services] [--db hotel.db]
+                                    [--batch-size 1000] [--delimiter ;]
+"""
+
+import argparse
+import csv
+import json
+import sqlite3
+import sys
+import time
+
+from database import HotelDatabase
+from records import FAULT_STATUSES, SERVICE_STATUSES
+
+FAULT_FIELDS = ("date", "room_number", "reporter", "fault_description")
+SERVICE_FIELDS = ("date", "service_description")
+
+def read_records(path, delimiter=","):
+    """Yield (line number, dict) for each record of a CSV or JSON-lines file"""
+    # utf-8-sig also accepts the byte order mark spreadsheets like to add
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        raise ValueError(f"line {line_number}: {e}") from None
+        else:
+            # Header is line 1
+            for line_number, record in enumerate(csv.DictReader(f, delimiter=delimiter), 2):
+                yield line_number, record
+
+def to_rows(records, fields, status_field, statuses, skipped):
+    """Turn records into row tuples; invalid records go to ``skipped`` with a reason"""
+    for line_number, record in records:
+        if not isinstance(record, dict):
+            # A JSON line holding a list, string or number
+            skipped.append((line_number, f"not an object: {type(record).__name__}"))
+            continue
+        values = [str(record.get(field) or "").strip() for field in fields]
+        if not all(values):
+            missing = [field for field, value in zip(fields, values) if not value]
+            skipped.append((line_number, "missing " + ", ".join(missing)))
+            continue
+        status = str(record.get(status_field) or "").strip()
+        if status and status not in statuses:
+            skipped.append((line_number, f"unknown {status_field} {status!r}"))
+            continue
+        yield tuple(values) + ((status,) if status else ())
+
+def import_file(db, path, services=False, batch_size=1000, delimiter=","):
+    """Import one file, print progress and return (inserted, skipped, seconds)"""
+    skipped = []
+    if services:
+        rows = to_rows(read_records(path, delimiter), SERVICE_FIELDS, "status",
+                       SERVICE_STATUSES, skipped)
+        add_bulk = db.add_special_services_bulk
+    else:
+        rows = to_rows(read_records(path, delimiter), FAULT_FIELDS, "fault_status",
+                       FAULT_STATUSES, skipped)
+        add_bulk = db.add_faults_bulk
+    
+    start = time.perf_counter()
+    
+    def progress(count):
+        elapsed = time.perf_counter() - start
+        print(f"\r   {count} rows ({count / elapsed:,.0f} rows/s)", end="", flush=True)
+    
+    try:
+        inserted = add_bulk(rows, batch_size=batch_size, progress=progress, raise_errors=True)
+    finally:
+        print()
+    elapsed = time.perf_counter() - start
+    return inserted, skipped, elapsed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arıza veya özel servis kayıtlarını toplu içe aktar")
+    parser.add_argument("file", help="CSV or JSON-lines (.jsonl) file")
+    parser.add_argument("--services", action="store_true", help="import special services instead of faults")
+    parser.add_argument("--db", default="hotel.db", help="database file (default: hotel.db)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows per executemany call")
+    parser.add_argument("--delimiter", default=",", help="CSV delimiter (default: ,)")
+    args = parser.parse_args(argv)
+    
+    db = HotelDatabase(args.db)
+    try:
+        print(f"📥 Importing {args.file}...")
+        inserted, skipped, elapsed = import_file(db, args.file, args.services,
+                                                 args.batch_size, args.delimiter)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        # Nothing has been committed: the import runs in one transaction
+        print(f"❌ Import failed: {e}")
+        return 1
+    finally:
+        db.close()
+    
+    for line_number, reason in skipped[:20]:
+        print(f"⚠️ Line {line_number} skipped, {reason}")
+    if len(skipped) > 20:
+        print(f"⚠️ ... and {len(skipped) - 20} more skipped lines")
+    
+    rate = inserted / elapsed if elapsed > 0 else 0
+    print(f"✅ Imported {inserted} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,476 @@
+"""
+Query instrumentation for HotelDatabase
+
+Every HotelDatabase method is timed together with the number of rows its
+statements returned or changed and whether it failed. Below that, every
+SQL statement run on a pooled connection is timed from execute() until
+its last row is fetched; statements slower than the threshold go to the
+slow-query log with their parameters and EXPLAIN QUERY PLAN output.
+
+Calls submitted through a DatabaseTaskRunner are labelled with the widget
+that submitted them (see screen()), so the cost of each screen of the
+GUI shows up separately. Metrics are kept per HotelDatabase in
+``db.metrics`` and can be exported as Prometheus text or as a JSON
+snapshot, see write_metrics().
+
+HOTEL_SLOW_QUERY_MS sets the slow-query threshold (default 100) and
+HOTEL_SLOW_QUERY_LOG names a file the slow-query log is appended to as
+JSON lines. Slow statements are also reported on stderr, except the
+batched executemany() of the bulk inserts, which are slow by design and
+would only interrupt an import's progress output.
+"""
+
+import bisect
+import collections
+import functools
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# Upper bounds in seconds of the operation latency histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+DEFAULT_SLOW_QUERY_MS = 100
+SLOW_LOG_SIZE = 200
+# Longest SQL text and parameter list kept per statement
+MAX_SQL_LENGTH = 300
+MAX_PARAMS_LENGTH = 300
+
+_EXPLAINABLE = re.compile(r'\s*(WITH|SELECT|INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+
+# Per thread: the screen label and the stack of running operations
+_context = threading.local()
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """SQL on one line, with IN lists collapsed so they group as one statement"""
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    sql = re.sub(r'\?(?:\s*,\s*\?)+', '?, ...', sql)
+    return sql[:MAX_SQL_LENGTH]
+
+
+@contextmanager
+def screen(name):
+    """Label the database calls made in this block with a screen name"""
+    previous = getattr(_context, 'screen', None)
+    _context.screen = name
+    try:
+        yield
+    finally:
+        _context.screen = previous
+
+
+def current_screen():
+    return getattr(_context, 'screen', None)
+
+
+def explain_query_plan(conn, sql, params=()):
+    """EXPLAIN QUERY PLAN of ``sql`` as indented lines, [] if there is none"""
+    if not _EXPLAINABLE.match(sql):
+        return []
+    try:
+        rows = sqlite3.Connection.execute(conn, 'EXPLAIN QUERY PLAN ' + sql, params).fetchall()
+    except sqlite3.Error:
+        return []
+    depth = {0: 0}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, 0) + 1
+        lines.append('  ' * (depth[node] - 1) + detail)
+    return lines
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels.items())
+
+
+class Operation:
+    """One running HotelDatabase method call"""
+
+    __slots__ = ('name', 'rows', 'failed')
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.failed = False
+
+
+class _OperationStats:
+    __slots__ = ('buckets', 'count', 'seconds', 'max_seconds', 'rows', 'errors')
+
+    def __init__(self, size):
+        # Per bucket, not cumulative; the last one is +Inf
+        self.buckets = [0] * (size + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.errors = 0
+
+
+class _StatementStats:
+    __slots__ = ('count', 'seconds', 'max_seconds', 'rows')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+
+
+class QueryMetrics:
+    """Timings of HotelDatabase operations and SQL statements, plus the slow-query log"""
+
+    def __init__(self, slow_threshold=None, slow_log_path=None, slow_log_size=SLOW_LOG_SIZE,
+                 buckets=BUCKETS):
+        # slow_threshold in seconds; None reads HOTEL_SLOW_QUERY_MS
+        if slow_threshold is None:
+            slow_threshold = float(os.environ.get("HOTEL_SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS)) / 1000
+        self.slow_threshold = slow_threshold
+        self.slow_log_path = slow_log_path or os.environ.get("HOTEL_SLOW_QUERY_LOG")
+        self.buckets = tuple(buckets)
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._operations = {}  # (operation, screen) -> _OperationStats
+        self._statements = {}  # normalized SQL -> _StatementStats
+        self.slow_queries = collections.deque(maxlen=slow_log_size)
+        self.slow_query_count = 0
+
+    def connect(self, db_name, **kwargs):
+        """sqlite3.connect() returning a connection that reports here"""
+        conn = sqlite3.connect(db_name, factory=InstrumentedConnection, **kwargs)
+        conn.metrics = self
+        return conn
+
+    @contextmanager
+    def operation(self, name):
+        """Time the block as one call of HotelDatabase method ``name``.
+
+        Statements run in the block add their rows to it; set ``failed``
+        on the yielded Operation when an error is handled inside.
+        """
+        stack = getattr(_context, 'operations', None)
+        if stack is None:
+            stack = _context.operations = []
+        operation = Operation(name)
+        stack.append(operation)
+        start = time.perf_counter()
+        try:
+            yield operation
+        except BaseException:
+            operation.failed = True
+            raise
+        finally:
+            stack.pop()
+            self.record_operation(name, time.perf_counter() - start, operation.rows,
+                                  operation.failed)
+
+    def record_operation(self, name, seconds, rows=0, failed=False, screen=None):
+        key = (name, screen or current_screen() or '')
+        with self._lock:
+            stats = self._operations.get(key)
+            if stats is None:
+                stats = self._operations[key] = _OperationStats(len(self.buckets))
+            stats.buckets[bisect.bisect_left(self.buckets, seconds)] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows
+            stats.errors += failed
+
+    def record_statement(self, conn, sql, params, seconds, rows):
+        """Count one statement; ``params`` is None for executemany()"""
+        text = normalize_sql(sql)
+        stack = getattr(_context, 'operations', None)
+        operation = stack[-1] if stack else None
+        if operation is not None:
+            operation.rows += rows
+        with self._lock:
+            stats = self._statements.get(text)
+            if stats is None:
+                stats = self._statements[text] = _StatementStats()
+            stats.count += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows
+        if seconds >= self.slow_threshold:
+            self._log_slow_query(conn, sql, text, params, seconds, rows, operation)
+
+    def _log_slow_query(self, conn, sql, text, params, seconds, rows, operation):
+        # The plan is taken on the connection that ran the statement,
+        # which the calling thread still holds
+        plan = explain_query_plan(conn, sql, params) if conn is not None and params is not None else []
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "seconds": round(seconds, 6),
+            "operation": operation.name if operation else None,
+            "screen": current_screen(),
+            "sql": text,
+            "params": "executemany" if params is None else repr(params)[:MAX_PARAMS_LENGTH],
+            "rows": rows,
+            "plan": plan,
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+            self.slow_query_count += 1
+        if params is not None:
+            print(f"[slow-query] {seconds * 1000:.1f} ms in {entry['operation'] or '-'}: {text}",
+                  file=sys.stderr)
+        if self.slow_log_path:
+            try:
+                with open(self.slow_log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"Error writing slow-query log: {e}", file=sys.stderr)
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._operations.clear()
+            self._statements.clear()
+            self.slow_queries.clear()
+            self.slow_query_count = 0
+            self.started = time.time()
+
+    def snapshot(self, retry_stats=None):
+        """Everything recorded so far as a JSON-serialisable dict.
+
+        ``retry_stats`` is RetryPolicy.stats() of the database, if wanted.
+        """
+        with self._lock:
+            operations = []
+            for (name, screen_name), stats in sorted(self._operations.items(),
+                                                     key=lambda item: -item[1].seconds):
+                operations.append({
+                    "operation": name,
+                    "screen": screen_name or None,
+                    "calls": stats.count,
+                    "errors": stats.errors,
+                    "rows": stats.rows,
+                    "seconds": stats.seconds,
+                    "mean_seconds": stats.seconds / stats.count,
+                    "max_seconds": stats.max_seconds,
+                    "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"],
+                                        _cumulative(stats.buckets))),
+                })
+            statements = [{
+                "sql": sql,
+                "calls": stats.count,
+                "rows": stats.rows,
+                "seconds": stats.seconds,
+                "mean_seconds": stats.seconds / stats.count,
+                "max_seconds": stats.max_seconds,
+            } for sql, stats in sorted(self._statements.items(), key=lambda item: -item[1].seconds)]
+            snapshot = {
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "uptime_seconds": time.time() - self.started,
+                "slow_threshold_seconds": self.slow_threshold,
+                "slow_query_count": self.slow_query_count,
+                "operations": operations,
+                "statements": statements,
+                "slow_queries": list(self.slow_queries),
+            }
+        if retry_stats is not None:
+            snapshot["retry"] = retry_stats
+        return snapshot
+
+    def prometheus(self, retry_stats=None):
+        """Everything recorded so far in the Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            operations = sorted(self._operations.items())
+            statements = sorted(self._statements.items())
+            slow_query_count = self.slow_query_count
+            metric("hotel_db_operation_seconds", "histogram", "Time spent in HotelDatabase methods")
+            for (name, screen_name), stats in operations:
+                labels = _labels(operation=name, screen=screen_name)
+                bounds = [str(b) for b in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, _cumulative(stats.buckets)):
+                    lines.append(f'hotel_db_operation_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"hotel_db_operation_seconds_sum{{{labels}}} {stats.seconds:.6f}")
+                lines.append(f"hotel_db_operation_seconds_count{{{labels}}} {stats.count}")
+            metric("hotel_db_operation_rows_total", "counter",
+                   "Rows returned or changed by HotelDatabase methods")
+            for (name, screen_name), stats in operations:
+                lines.append(f"hotel_db_operation_rows_total{{{_labels(operation=name, screen=screen_name)}}} "
+                             f"{stats.rows}")
+            metric("hotel_db_operation_errors_total", "counter", "HotelDatabase methods that failed")
+            for (name, screen_name), stats in operations:
+                lines.append(f"hotel_db_operation_errors_total{{{_labels(operation=name, screen=screen_name)}}} "
+                             f"{stats.errors}")
+            metric("hotel_db_statement_seconds_total", "counter", "Time spent in each SQL statement")
+            for sql, stats in statements:
+                lines.append(f"hotel_db_statement_seconds_total{{{_labels(statement=sql)}}} {stats.seconds:.6f}")
+            metric("hotel_db_statements_total", "counter", "Executions of each SQL statement")
+            for sql, stats in statements:
+                lines.append(f"hotel_db_statements_total{{{_labels(statement=sql)}}} {stats.count}")
+            metric("hotel_db_statement_rows_total", "counter",
+                   "Rows returned or changed by each SQL statement")
+            for sql, stats in statements:
+                lines.append(f"hotel_db_statement_rows_total{{{_labels(statement=sql)}}} {stats.rows}")
+        metric("hotel_db_slow_queries_total", "counter", "Statements slower than the slow-query threshold")
+        lines.append(f"hotel_db_slow_queries_total {slow_query_count}")
+        if retry_stats is not None:
+            metric("hotel_db_busy_events_total", "counter", "SQLITE_BUSY errors that were retried or failed")
+            lines.append(f"hotel_db_busy_events_total {retry_stats['busy_events']}")
+            metric("hotel_db_busy_failures_total", "counter", "Calls that stayed busy after every retry")
+            lines.append(f"hotel_db_busy_failures_total {retry_stats['failures']}")
+            metric("hotel_db_retry_wait_seconds_total", "counter", "Time spent backing off before retries")
+            lines.append(f"hotel_db_retry_wait_seconds_total {retry_stats['wait_time']:.6f}")
+        return "\n".join(lines) + "\n"
+
+
+def _cumulative(counts):
+    total = 0
+    result = []
+    for count in counts:
+        total += count
+        result.append(total)
+    return result
+
+
+def write_metrics(db, path):
+    """Write the metrics of HotelDatabase ``db`` to ``path``.
+
+    A path ending in ``.prom`` gets Prometheus text (for node_exporter's
+    textfile collector), anything else a JSON snapshot. The file is
+    replaced in one step, so readers never see half of it.
+    """
+    retry_stats = db.retry_policy.stats()
+    if path.endswith(".prom"):
+        text = db.metrics.prometheus(retry_stats)
+    else:
+        text = json.dumps(db.metrics.snapshot(retry_stats), indent=2, ensure_ascii=False)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(temporary, path)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement to its connection's QueryMetrics.
+
+    A statement is timed from execute() until it is exhausted, read with
+    fetchall() or fetchone(), closed, or replaced by the next execute().
+    Statements that return no rows report their rowcount.
+    """
+
+    def __init__(self, connection):
+        super().__init__(connection)
+        self._sql = None
+        self._params = None
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self._elapsed = time.perf_counter() - start
+        self._sql = sql
+        self._params = parameters
+        self._rows = 0
+        if self.description is None:
+            self._rows = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._elapsed = time.perf_counter() - start
+        self._sql = sql
+        self._params = None
+        self._rows = max(self.rowcount, 0)
+        self._finish()
+        return self
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._elapsed += time.perf_counter() - start
+        if row is not None:
+            self._rows += 1
+        self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._elapsed += time.perf_counter() - start
+        self._rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._elapsed += time.perf_counter() - start
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._elapsed += time.perf_counter() - start
+            self._finish()
+            raise
+        self._elapsed += time.perf_counter() - start
+        self._rows += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # The connection may be in another thread's hands by now: no plan
+        if getattr(self, '_sql', None) is not None:
+            self._finish(explain=False)
+
+    def _finish(self, explain=True):
+        sql = self._sql
+        if sql is None:
+            return
+        self._sql = None
+        metrics = getattr(self.connection, 'metrics', None)
+        if metrics is not None:
+            metrics.record_statement(self.connection if explain else None, sql, self._params,
+                                     self._elapsed, self._rows)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors are InstrumentedCursors (see QueryMetrics.connect)"""
+
+    metrics = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
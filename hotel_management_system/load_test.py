@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Multi-terminal contention load test
+
+Starts N worker processes, each standing in for one front-desk,
+housekeeping or F&B terminal, that drive a weighted mix of
+``get_pending_faults``, ``add_fault``, ``update_fault_status``,
+``update_shift`` and ``add_special_service`` against one shared database
+file for a fixed time. Reported per operation: throughput, p50/p95/p99
+latency, SQLITE_BUSY events, time spent waiting between busy retries and
+errors (calls that failed even after retrying).
+
+Waits inside SQLite's own busy handler (``busy_timeout``) are part of the
+latency; run with ``--busy-timeout 0`` to make every lock wait show up as
+a busy event and retry wait instead. ``--profile`` and ``--pool-size``
+compare journaling and pooling choices on the same workload.
+
+Usage: python load_test.py [--db load.db] [--workers 4] [--threads 1]
+                           [--duration 10] [--profile default]
+                           [--busy-timeout MS] [--pool-size N]
+                           [--mix get_pending_faults=50,add_fault=15,...]
+                           [--seed-faults 10000] [--think-ms 0]
+                           [--output results.json]
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from connection_pool import PROFILES, RetryPolicy, is_busy_error
+from database import HotelDatabase
+from synthetic_data import COVER_COLORS, REPORTERS, ROOMS, SERVICE_DESCRIPTIONS, STAFF, populate
+
+# Relative weights of the operations a terminal performs
+DEFAULT_MIX = {
+    "get_pending_faults": 50,
+    "add_fault": 15,
+    "update_fault_status": 20,
+    "update_shift": 5,
+    "add_special_service": 10,
+}
+
+PERCENTILES = (50, 95, 99)
+
+class _CallCounters(threading.local):
+    def __init__(self):
+        self.busy = 0
+        self.retry_wait = 0.0
+        self.error = None
+
+class OperationRetryPolicy(RetryPolicy):
+    """RetryPolicy that also counts busy events and retry waits per thread.
+
+    The shared counters of RetryPolicy.stats() mix up the threads of a
+    process; these per-thread ones can be attributed to the call that
+    caused them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.local = _CallCounters()
+
+    def reset(self):
+        """Start counting for a new call on this thread"""
+        self.local.__init__()
+
+    def call(self, func, *args, **kwargs):
+        local = self.local
+
+        def attempt(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if is_busy_error(e):
+                    local.busy += 1
+                raise
+
+        try:
+            return super().call(attempt, *args, **kwargs)
+        except sqlite3.Error as e:
+            local.error = str(e)
+            raise
+
+    def backoff(self, pause):
+        super().backoff(pause)
+        self.local.retry_wait += pause
+
+def parse_mix(text):
+    """``name=weight,...`` into a dict of known operations"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation: {name}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for {name}: {weight}") from None
+    return mix
+
+def operations(db, rng, max_fault_id):
+    """The callable for each operation in the mix"""
+    today = datetime.now().strftime('%Y-%m-%d')
+    return {
+        "get_pending_faults": lambda: db.get_pending_faults(),
+        "add_fault": lambda: db.add_fault(today, rng.choice(ROOMS), rng.choice(REPORTERS),
+                                          "Yük testi arızası"),
+        "update_fault_status": lambda: db.update_fault_status(
+            rng.randint(1, max_fault_id), rng.choice(["Bekleniyor", "Çözüldü", "Çözülemedi"])),
+        "update_shift": lambda: db.update_shift(today, ", ".join(rng.sample(STAFF, 8)),
+                                                rng.choice(STAFF), rng.choice(COVER_COLORS)),
+        "add_special_service": lambda: db.add_special_service(today, rng.choice(SERVICE_DESCRIPTIONS)),
+    }
+
+def run_thread(db, policy, mix, seed, max_fault_id, deadline, think, results):
+    rng = random.Random(seed)
+    calls = operations(db, rng, max_fault_id)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        policy.reset()
+        start = time.perf_counter()
+        calls[name]()
+        latency = time.perf_counter() - start
+        record = results.setdefault(name, {"latencies": [], "busy": 0, "retry_wait": 0.0,
+                                           "errors": 0, "error_messages": {}})
+        record["latencies"].append(latency)
+        record["busy"] += policy.local.busy
+        record["retry_wait"] += policy.local.retry_wait
+        if policy.local.error:
+            record["errors"] += 1
+            messages = record["error_messages"]
+            messages[policy.local.error] = messages.get(policy.local.error, 0) + 1
+        if think:
+            time.sleep(rng.uniform(0, 2 * think))
+
+def worker(index, args, max_fault_id, barrier, queue):
+    """One terminal: its own HotelDatabase, ``args.threads`` threads"""
+    profile = dict(PROFILES[args.profile])
+    if args.busy_timeout is not None:
+        profile["busy_timeout"] = args.busy_timeout
+    policy = OperationRetryPolicy()
+    # HotelDatabase methods print their errors; they are counted instead
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        db = HotelDatabase(args.db, pool_size=args.pool_size or args.threads, profile=profile,
+                           retry_policy=policy, cache=False)
+        barrier.wait()
+        deadline = time.monotonic() + args.duration
+        results = [{} for _ in range(args.threads)]
+        threads = [threading.Thread(target=run_thread,
+                                    args=(db, policy, args.mix, f"{args.seed}-{index}-{n}",
+                                          max_fault_id, deadline, args.think_ms / 1000,
+                                          results[n]))
+                   for n in range(args.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        db.close()
+    queue.put(results)
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+def summarize(thread_results, duration):
+    """Merge the per-thread records into per-operation statistics"""
+    merged = {}
+    for results in thread_results:
+        for name, record in results.items():
+            total = merged.setdefault(name, {"latencies": [], "busy": 0, "retry_wait": 0.0,
+                                             "errors": 0, "error_messages": {}})
+            total["latencies"].extend(record["latencies"])
+            total["busy"] += record["busy"]
+            total["retry_wait"] += record["retry_wait"]
+            total["errors"] += record["errors"]
+            for message, count in record["error_messages"].items():
+                total["error_messages"][message] = total["error_messages"].get(message, 0) + count
+
+    summary = {}
+    for name, record in sorted(merged.items()):
+        latencies = sorted(record["latencies"])
+        summary[name] = {
+            "count": len(latencies),
+            "per_second": len(latencies) / duration,
+            **{f"p{p}_ms": percentile(latencies, p) * 1000 for p in PERCENTILES},
+            "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+            "busy_events": record["busy"],
+            "retry_wait_s": record["retry_wait"],
+            "errors": record["errors"],
+            "error_messages": record["error_messages"],
+        }
+    return summary
+
+def journal_mode(db_name):
+    conn = sqlite3.connect(db_name)
+    try:
+        return conn.execute('PRAGMA journal_mode').fetchone()[0]
+    finally:
+        conn.close()
+
+def run(args):
+    """Prepare the database, run the workers and return the report dict"""
+    profile = dict(PROFILES[args.profile])
+    if args.busy_timeout is not None:
+        profile["busy_timeout"] = args.busy_timeout
+    db = HotelDatabase(args.db, profile=profile)
+    try:
+        if args.seed_faults and not db.count_faults():
+            print(f"📦 Generating {args.seed_faults} faults...")
+            populate(db, args.seed_faults, seed=args.seed, years=1)
+        max_fault_id = max(1, db.count_faults())
+    finally:
+        db.close()
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.workers + 1)
+    queue = context.Queue()
+    processes = [context.Process(target=worker, args=(n, args, max_fault_id, barrier, queue))
+                 for n in range(args.workers)]
+    for process in processes:
+        process.start()
+    # Start the clock once every terminal has opened the database
+    barrier.wait()
+    start = time.perf_counter()
+    print(f"🚦 {args.workers} terminals x {args.threads} threads for {args.duration}s...")
+    thread_results = []
+    for _ in processes:
+        thread_results.extend(queue.get())
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.join()
+
+    operations_summary = summarize(thread_results, elapsed)
+    total = sum(op["count"] for op in operations_summary.values())
+    return {
+        "config": {
+            "db": args.db, "workers": args.workers, "threads": args.threads,
+            "pool_size": args.pool_size or args.threads, "profile": args.profile,
+            "journal_mode": journal_mode(args.db), "busy_timeout": profile.get("busy_timeout"),
+            "duration": args.duration, "think_ms": args.think_ms, "mix": args.mix,
+            "seed": args.seed, "sqlite": sqlite3.sqlite_version,
+        },
+        "elapsed": elapsed,
+        "total_operations": total,
+        "total_per_second": total / elapsed,
+        "operations": operations_summary,
+    }
+
+def print_report(report):
+    config = report["config"]
+    print(f"\n📊 {config['workers']} terminals x {config['threads']} threads, pool {config['pool_size']}, "
+          f"journal {config['journal_mode']}, busy_timeout {config['busy_timeout']} ms")
+    print(f"{'operation':<22} {'count':>7} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'busy':>6} {'wait s':>7} {'errors':>6}")
+    for name, op in report["operations"].items():
+        print(f"{name:<22} {op['count']:>7} {op['per_second']:>8.1f} {op['p50_ms']:>8.2f} "
+              f"{op['p95_ms']:>8.2f} {op['p99_ms']:>8.2f} {op['max_ms']:>8.1f} "
+              f"{op['busy_events']:>6} {op['retry_wait_s']:>7.2f} {op['errors']:>6}")
+        for message, count in op["error_messages"].items():
+            print(f"   ⚠️ {count} x {message}")
+    print(f"{'total':<22} {report['total_operations']:>7} {report['total_per_second']:>8.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Çoklu terminal eşzamanlılık yük testi")
+    parser.add_argument("--db", help="shared database file (default: a new temporary file)")
+    parser.add_argument("--workers", type=int, default=4, help="terminal processes (default: 4)")
+    parser.add_argument("--threads", type=int, default=1, help="threads per terminal (default: 1)")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to run (default: 10)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="default",
+                        help="PRAGMA profile of the terminals (default: default)")
+    parser.add_argument("--busy-timeout", type=int, help="override the profile's busy_timeout (ms)")
+    parser.add_argument("--pool-size", type=int, help="connections per terminal (default: --threads)")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="operation weights, e.g. get_pending_faults=50,add_fault=15")
+    parser.add_argument("--seed-faults", type=int, default=10000,
+                        help="synthetic faults to create in an empty database (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--think-ms", type=float, default=0,
+                        help="mean pause between a terminal's operations (default: 0)")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        args.db = args.db or os.path.join(tmp, "load.db")
+        report = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Report written to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,72 @@
 import sys
 import os
+import time
+import argparse
+
+# Taken before the Qt imports so --profile-startup includes them
+_PROCESS_START = time.perf_counter()
+
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QVBoxLayout, 
                              QWidget, QLabel, QMessageBox)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QIcon
 
-# Import custom modules
-from database import HotelDatabase
-from ui_fault_management import FaultManagementWidget
-from ui_fb_menu import FBManagementWidget
+# Import custom modules (the tab modules are imported when first shown)
+from database import get_database
+from instrumentation import write_metrics
+from db_workers import database_thread_pool, DatabaseTaskRunner
+from ui_lazy_tab import LazyTab
+import profiling
+
+def create_fault_tab():
+    from ui_fault_management import FaultManagementWidget
+    return FaultManagementWidget()
+
+def create_fb_tab():
+    from ui_fb_menu import FBManagementWidget
+    return FBManagementWidget()
+
+# How often --metrics-file is rewritten while the application runs
+METRICS_INTERVAL_MS = 60000
 
 class HotelManagementSystem(QMainWindow):
-    def __init__(self):
+    def __init__(self, metrics_file=None):
         super().__init__()
+        self.db = None
+        self.metrics_file = metrics_file
+        self.runner = DatabaseTaskRunner(self)
         self.init_ui()
         self.init_database()
     
     def init_database(self):
-        """Initialize database connection"""
+        """Initialize database connection in the background"""
+        self.runner.submit("init_database", get_database,
+                           on_result=self.on_database_ready,
+                           on_error=self.on_database_error)
+    
+    def on_database_ready(self, db):
+        self.db = db
+        print("Database initialized successfully")
+        self.fault_tab.set_ready()
+        self.fb_tab.set_ready()
+        if self.metrics_file:
+            self.metrics_timer = QTimer(self)
+            self.metrics_timer.timeout.connect(self.write_metrics)
+            self.metrics_timer.start(METRICS_INTERVAL_MS)
+    
+    def write_metrics(self):
+        """Export the query metrics to --metrics-file"""
+        if self.db is None or not self.metrics_file:
+            return
         try:
-            self.db = HotelDatabase()
-            print("Database initialized successfully")
-        except Exception as e:
-            QMessageBox.critical(self, "Database Error", 
-                               f"Failed to initialize database: {str(e)}")
-            sys.exit(1)
+            write_metrics(self.db, self.metrics_file)
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
+    
+    def on_database_error(self, message):
+        QMessageBox.critical(self, "Database Error", 
+                           f"Failed to initialize database: {message}")
+        sys.exit(1)
     
     def init_ui(self):
         """Initialize the user interface"""
@@ -87,13 +129,15 @@ class HotelManagementSystem(QMainWindow):
         """)
         
         try:
-            # Add Fault Management tab
-            fault_widget = FaultManagementWidget()
-            self.tab_widget.addTab(fault_widget, "🔧 Teknik Servis")
+            # Add Fault Management tab (built when first shown)
+            # Not built before the database is ready: the widgets call
+            # get_database(), which waits for the background initialisation
+            self.fault_tab = LazyTab("FaultManagementWidget", create_fault_tab, ready=False)
+            self.tab_widget.addTab(self.fault_tab, "🔧 Teknik Servis")
             
-            # Add F&B Management tab
-            fb_widget = FBManagementWidget()
-            self.tab_widget.addTab(fb_widget, "🍽️ F&B Menüsü")
+            # Add F&B Management tab (built when first shown)
+            self.fb_tab = LazyTab("FBManagementWidget", create_fb_tab, ready=False)
+            self.tab_widget.addTab(self.fb_tab, "🍽️ F&B Menüsü")
             
         except Exception as e:
             QMessageBox.critical(self, "UI Error", 
@@ -134,14 +178,41 @@ class HotelManagementSystem(QMainWindow):
                                    QMessageBox.No)
         
         if reply == QMessageBox.Yes:
+            # Let queries already running on worker threads finish
+            database_thread_pool().waitForDone(3000)
+            self.write_metrics()
             event.accept()
         else:
             event.ignore()
 
+def parse_args(argv):
+    """Parse our own options; everything else is passed on to Qt"""
+    parser = argparse.ArgumentParser(description="Otel Yönetim Sistemi")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print time to first paint and per-tab build times")
+    parser.add_argument("--profile", nargs="?", const="session", choices=("session", "action"),
+                        help="record cProfile, tracemalloc and event-loop stalls for the whole "
+                             f"session, or with 'action' between presses of {profiling.ACTION_SHORTCUT}, "
+                             "and write a report for each recording")
+    parser.add_argument("--profile-dir", default="profiles", metavar="DIR",
+                        help="directory for --profile reports (default: profiles)")
+    parser.add_argument("--stall-ms", type=int, default=profiling.DEFAULT_STALL_MS,
+                        help="report event-loop stalls of at least this many ms "
+                             f"(default: {profiling.DEFAULT_STALL_MS})")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="write database query metrics to PATH every minute and on exit "
+                             "(Prometheus text for *.prom, JSON otherwise)")
+    return parser.parse_known_args(argv[1:])
+
 def main():
     """Main application entry point"""
+    args, qt_args = parse_args(sys.argv)
+    if args.profile_startup:
+        profiling.startup_profiler = profiling.StartupProfiler(_PROCESS_START)
+        profiling.startup_profiler.mark("imports done")
+    
     # Create QApplication
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     
     # Set application properties
     app.setApplicationName("Otel Yönetim Sistemi")
@@ -151,10 +222,27 @@ def main():
     # Set application style
     app.setStyle('Fusion')  # Modern look
     
+    session_profiler = None
+    if args.profile:
+        session_profiler = profiling.SessionProfiler(args.profile, args.profile_dir,
+                                                     args.stall_ms / 1000)
+        if args.profile == "session":
+            session_profiler.begin()
+    
     try:
         # Create and show main window
-        window = HotelManagementSystem()
+        window = HotelManagementSystem(metrics_file=args.metrics_file)
+        if session_profiler:
+            session_profiler.database = lambda: window.db
+            session_profiler.attach(window)
+            app.aboutToQuit.connect(session_profiler.end)
+        profiler = profiling.startup_profiler
+        if profiler:
+            profiler.mark("main window constructed")
+            profiler.watch_first_paint(window)
         window.show()
+        if profiler:
+            profiler.mark("main window shown")
         
         # Start event loop
         sys.exit(app.exec_())
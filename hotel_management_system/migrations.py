@@ -0,0 +1,312 @@
+"""
+Forward-only schema migrations for the hotel database.
+
+The applied version is stored in ``PRAGMA user_version``. Each step runs
+in its own write transaction together with the version bump, so an
+interrupted upgrade never leaves a half-applied step behind.
+"""
+
+import sqlite3
+
+
+def _add_lookup_indexes(conn):
+    """Indexes for the pending-fault list and the per-day lookups"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_faults_status_date ON faults (fault_status, date)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_faults_date ON faults (date)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_special_services_date ON special_services (date)')
+
+
+def _unique_day_rows(conn):
+    """One shift and one menu per date; keep the newest row of duplicates"""
+    for table in ("shifts", "menus"):
+        conn.execute(f'''
+            DELETE FROM {table}
+            WHERE id NOT IN (SELECT MAX(id) FROM {table} GROUP BY date)
+        ''')
+        conn.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_date ON {table} (date)')
+
+
+# Tables whose row changes are recorded in change_log
+TRACKED_TABLES = ("faults", "special_services", "shifts", "menus")
+
+
+def _add_change_log(conn):
+    """Monotonic log of row changes, filled by triggers on the tracked tables"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            revision INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            operation TEXT NOT NULL,
+            changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    for table in TRACKED_TABLES:
+        for operation, row in (("insert", "new"), ("update", "new"), ("delete", "old")):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation}_log
+                AFTER {operation.upper()} ON {table}
+                BEGIN
+                    INSERT INTO change_log (table_name, row_id, operation)
+                    VALUES ('{table}', {row}.id, '{operation}');
+                END
+            ''')
+
+
+# Full-text indexed columns per table. unicode61 with remove_diacritics 2
+# folds case and ç/ğ/ö/ş/ü/İ to ASCII; the dotless ı is folded to i by
+# fold_sql() so that "klima", "KLİMA" and "klıma" all match.
+SEARCH_COLUMNS = {
+    "faults": ("room_number", "reporter", "fault_description"),
+    "special_services": ("service_description",),
+}
+
+
+def fold_sql(expression):
+    """SQL for the folding applied to indexed text (see database.fold_search_text)"""
+    return f"replace({expression}, 'ı', 'i')"
+
+
+def _add_search_index(conn):
+    """Contentless FTS5 indexes over faults and special services, kept by triggers"""
+    for table, columns in SEARCH_COLUMNS.items():
+        column_list = ", ".join(columns)
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5(
+                {column_list}, content='', tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+        new_values = ", ".join(fold_sql(f"new.{c}") for c in columns)
+        old_values = ", ".join(fold_sql(f"old.{c}") for c in columns)
+        # A contentless index is told what to remove with the old values
+        delete = (f"INSERT INTO {table}_fts ({table}_fts, rowid, {column_list}) "
+                  f"VALUES ('delete', old.id, {old_values});")
+        insert = f"INSERT INTO {table}_fts (rowid, {column_list}) VALUES (new.id, {new_values});"
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_insert_fts AFTER INSERT ON {table}
+            BEGIN {insert} END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_delete_fts AFTER DELETE ON {table}
+            BEGIN {delete} END
+        ''')
+        # Status changes do not touch the indexed columns
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_update_fts
+            AFTER UPDATE OF {column_list} ON {table}
+            BEGIN {delete} {insert} END
+        ''')
+        conn.execute(f'''
+            INSERT INTO {table}_fts (rowid, {column_list})
+            SELECT id, {", ".join(fold_sql(c) for c in columns)} FROM {table}
+        ''')
+
+
+def _add_sort_indexes(conn):
+    """Indexes for filtering and sorting the fault list by room or reporter"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_faults_room_date ON faults (room_number, date)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_faults_reporter_date ON faults (reporter, date)')
+
+
+def _add_maintenance_log(conn):
+    """When each scheduled maintenance task last ran, shared by all terminals"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            task TEXT PRIMARY KEY,
+            last_run TEXT NOT NULL
+        )
+    ''')
+
+
+# Counted dimensions of fault_counts: name -> SQL expression over a faults row
+# ("{row}" is new or old). Floors are the room number without its last two
+# digits; rooms that are not three or more digits count as floor "-".
+COUNT_DIMENSIONS = {
+    "status": "''",
+    "reporter": "{row}.reporter",
+    "floor": ("CASE WHEN {row}.room_number GLOB '[0-9][0-9][0-9]*' "
+              "THEN substr({row}.room_number, 1, length({row}.room_number) - 2) ELSE '-' END"),
+    "day": "{row}.date",
+}
+
+# Local time, so recorded transitions match the hotel's clock
+NOW_SQL = "datetime('now', 'localtime')"
+
+
+def _count_statements(row, delta):
+    return "\n".join(f'''
+        INSERT INTO fault_counts (dimension, key, status, count)
+        VALUES ('{dimension}', {expression.format(row=row)}, {row}.fault_status, {delta})
+        ON CONFLICT (dimension, key, status) DO UPDATE SET count = count + {delta};'''
+        for dimension, expression in COUNT_DIMENSIONS.items())
+
+
+def _resolution_seconds(row):
+    return (f"CASE WHEN {row}.resolved_at IS NULL THEN 0 "
+            f"ELSE (julianday({row}.resolved_at) - julianday({row}.opened_at)) * 86400 END")
+
+
+def _add_fault_statistics(conn):
+    """Status history, resolution times and trigger-maintained fault counters"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fault_status_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fault_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            changed_at TEXT NOT NULL
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_fault_status_history_fault ON fault_status_history (fault_id)')
+    # When a fault was reported and resolved, as seen by this database;
+    # resolved_at is only set by an observed change to "Çözüldü"
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fault_timestamps (
+            fault_id INTEGER PRIMARY KEY,
+            opened_at TEXT NOT NULL,
+            resolved_at TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fault_resolution_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            resolved INTEGER NOT NULL,
+            total_seconds REAL NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO fault_resolution_totals VALUES (1, 0, 0)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fault_counts (
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, key, status)
+        ) WITHOUT ROWID
+    ''')
+
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_faults_insert_stats AFTER INSERT ON faults
+        BEGIN
+            INSERT INTO fault_status_history (fault_id, status, changed_at)
+            VALUES (new.id, new.fault_status, {NOW_SQL});
+            INSERT OR REPLACE INTO fault_timestamps (fault_id, opened_at) VALUES (new.id, {NOW_SQL});
+            {_count_statements("new", 1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_faults_delete_stats AFTER DELETE ON faults
+        BEGIN
+            DELETE FROM fault_timestamps WHERE fault_id = old.id;
+            {_count_statements("old", -1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_faults_status_stats
+        AFTER UPDATE OF fault_status ON faults
+        WHEN new.fault_status IS NOT old.fault_status
+        BEGIN
+            INSERT INTO fault_status_history (fault_id, status, changed_at)
+            VALUES (new.id, new.fault_status, {NOW_SQL});
+            UPDATE fault_timestamps
+            SET resolved_at = CASE WHEN new.fault_status = 'Çözüldü' THEN {NOW_SQL} END
+            WHERE fault_id = new.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_faults_update_counts
+        AFTER UPDATE OF fault_status, reporter, room_number, date ON faults
+        BEGIN
+            {_count_statements("old", -1)}
+            {_count_statements("new", 1)}
+        END
+    ''')
+    # Running totals for the mean time to resolution
+    added = ("+ (new.resolved_at IS NOT NULL)", f"+ {_resolution_seconds('new')}")
+    removed = ("- (old.resolved_at IS NOT NULL)", f"- {_resolution_seconds('old')}")
+    for operation, event, (resolved, seconds) in (
+            ("insert", "INSERT", added),
+            ("delete", "DELETE", removed),
+            ("update", "UPDATE OF resolved_at",
+             (f"{added[0]} {removed[0]}", f"{added[1]} {removed[1]}"))):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_fault_timestamps_{operation}_totals
+            AFTER {event} ON fault_timestamps
+            BEGIN
+                UPDATE fault_resolution_totals
+                SET resolved = resolved {resolved}, total_seconds = total_seconds {seconds}
+                WHERE id = 1;
+            END
+        ''')
+
+    # Count the faults that are already there
+    for dimension, expression in COUNT_DIMENSIONS.items():
+        key = expression.format(row="faults")
+        conn.execute(f'''
+            INSERT OR REPLACE INTO fault_counts (dimension, key, status, count)
+            SELECT '{dimension}', {key}, fault_status, COUNT(*) FROM faults
+            GROUP BY {key}, fault_status
+        ''')
+
+
+def _backfill_fault_timestamps(conn):
+    """Timestamps for faults reported before migration 7 added its triggers.
+
+    Without a row, a fault that was still open never counts towards the
+    mean time to resolution once it is resolved; its report date stands in
+    for the time it was opened. Faults that were already resolved get no
+    resolved_at: when that happened was never recorded, and a guess would
+    skew the mean, so they stay out of it.
+    """
+    conn.execute('''
+        INSERT OR IGNORE INTO fault_timestamps (fault_id, opened_at)
+        SELECT id, date FROM faults
+    ''')
+
+
+# (version, description, step) - append only, never renumber
+MIGRATIONS = [
+    (1, "lookup indexes on faults and special_services", _add_lookup_indexes),
+    (2, "unique date on shifts and menus", _unique_day_rows),
+    (3, "change log with triggers", _add_change_log),
+    (4, "full-text search over faults and special services", _add_search_index),
+    (5, "room and reporter indexes on faults", _add_sort_indexes),
+    (6, "maintenance log", _add_maintenance_log),
+    (7, "fault status history and statistics", _add_fault_statistics),
+    (8, "timestamps for faults reported before version 7", _backfill_fault_timestamps),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database file"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn):
+    """Apply all pending migrations and return the resulting version"""
+    version = get_schema_version(conn)
+    if version > LATEST_VERSION:
+        print(f"Database schema version {version} is newer than this application ({LATEST_VERSION})")
+        return version
+
+    for step_version, description, step in MIGRATIONS:
+        if step_version <= version:
+            continue
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Another terminal may have upgraded while we waited for the lock
+            if get_schema_version(conn) >= step_version:
+                conn.rollback()
+                version = get_schema_version(conn)
+                continue
+            step(conn)
+            conn.execute(f'PRAGMA user_version = {step_version:d}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        print(f"Database migrated to version {step_version}: {description}")
+        version = step_version
+
+    return version
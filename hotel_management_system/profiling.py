@@ -0,0 +1,306 @@
+"""
+Profiling for the GUI
+
+main.py --profile-startup reports time to the main window being
+constructed, time to first paint and how long each lazily built tab took
+to construct.
+
+main.py --profile records a cProfile of the GUI thread, tracemalloc
+allocation sites, event-loop stalls with the stack that caused them and
+database time per screen (see instrumentation.py) for the whole session,
+or with ``--profile action`` for each action recorded between presses
+of ACTION_SHORTCUT, and writes a report file per recording.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from datetime import datetime
+
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+# Set by main() when --profile-startup is given; LazyTab reports into it
+startup_profiler = None
+
+def record_widget(name, seconds):
+    """Record how long a widget took to build (no-op unless profiling)"""
+    if startup_profiler is not None:
+        startup_profiler.record_widget(name, seconds)
+
+class StartupProfiler(QObject):
+    def __init__(self, start_time=None):
+        super().__init__()
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.marks = []
+        self.widgets = []
+        self.first_paint = None
+        self.reported = False
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def mark(self, label):
+        """Record a named point in the startup sequence"""
+        self.marks.append((label, self.elapsed()))
+
+    def record_widget(self, name, seconds):
+        self.widgets.append((name, seconds))
+        if self.reported:
+            print(f"[startup] {name} built on first activation in {seconds * 1000:.1f} ms")
+        elif self.first_paint is not None:
+            QTimer.singleShot(0, self.report)
+
+    def watch_first_paint(self, window):
+        """Note the first paint event of the main window"""
+        self._window = window
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and self.first_paint is None:
+            self.first_paint = self.elapsed()
+            obj.removeEventFilter(self)
+            if self.widgets:
+                QTimer.singleShot(0, self.report)
+        return False
+
+    def report(self):
+        """Print the startup timings once"""
+        if self.reported:
+            return
+        self.reported = True
+        print("[startup] Startup profile")
+        for label, seconds in self.marks:
+            print(f"[startup]   {label:<28} {seconds * 1000:8.1f} ms")
+        if self.first_paint is not None:
+            print(f"[startup]   {'time to first paint':<28} {self.first_paint * 1000:8.1f} ms")
+        for name, seconds in self.widgets:
+            print(f"[startup]   build {name:<22} {seconds * 1000:8.1f} ms")
+        print(f"[startup]   {'first tab ready':<28} {self.elapsed() * 1000:8.1f} ms")
+
+DEFAULT_STALL_MS = 200
+ACTION_SHORTCUT = "Ctrl+Shift+P"
+# Rows per table in a report and frames kept per stall
+REPORT_LINES = 40
+STALL_FRAMES = 25
+
+class StallWatchdog:
+    """Records GUI event-loop stalls of at least ``threshold`` seconds.
+
+    A timer on the GUI thread beats every ``interval`` seconds. A watcher
+    thread notices when the beats stop and takes the GUI thread's stack
+    at that moment, so each stall comes with the code that caused it.
+    """
+
+    def __init__(self, threshold, interval=0.02):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = []  # (seconds since start, duration, stack lines)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stack = None
+        self._timer = None
+
+    def start(self):
+        self._gui_thread = threading.get_ident()
+        self.start_time = self._last_beat = time.perf_counter()
+        self._timer = QTimer()
+        self._timer.timeout.connect(self._beat)
+        self._timer.start(int(self.interval * 1000))
+        self._stop.clear()
+        threading.Thread(target=self._watch, name="stall-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._timer is not None:
+            self._timer.stop()
+            self._beat()
+
+    def _beat(self):
+        now = time.perf_counter()
+        with self._lock:
+            started = self._last_beat
+            self._last_beat = now
+            stack, self._stack = self._stack, None
+        if now - started >= self.threshold:
+            self.stalls.append((started - self.start_time, now - started,
+                                stack or ["(stack not captured)\n"]))
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                beat = self._last_beat
+                stalled = self._stack is None and time.perf_counter() - beat >= self.threshold
+            if not stalled:
+                continue
+            frame = sys._current_frames().get(self._gui_thread)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)[-STALL_FRAMES:]
+            with self._lock:
+                # Only if this is still the stall that was seen above
+                if self._last_beat == beat:
+                    self._stack = stack
+
+def _database_totals(db):
+    if db is None or getattr(db, "metrics", None) is None:
+        return {}
+    return {(entry["operation"], entry["screen"] or "-"):
+            (entry["calls"], entry["seconds"], entry["rows"])
+            for entry in db.metrics.snapshot()["operations"]}
+
+class SessionProfiler:
+    """cProfile, tracemalloc and stall recording for main.py --profile.
+
+    In "session" mode main() calls begin() at startup and end() when
+    the application quits. In "action" mode ACTION_SHORTCUT toggles recording, so one
+    slow user action can be captured on its own. Each recording writes
+    a text report to ``output_dir`` plus the raw cProfile data (.prof,
+    for pstats or snakeviz). ``database`` returns the HotelDatabase
+    whose query metrics are included, or None.
+    """
+
+    def __init__(self, mode="session", output_dir="profiles",
+                 stall_threshold=DEFAULT_STALL_MS / 1000, database=None):
+        self.mode = mode
+        self.output_dir = output_dir
+        self.stall_threshold = stall_threshold
+        self.database = database or (lambda: None)
+        self.recording = False
+        self.window = None
+        self.reports = []
+
+    def attach(self, window):
+        """Bind the action shortcut (action mode) and show recording in the title"""
+        from PyQt5.QtGui import QKeySequence
+        from PyQt5.QtWidgets import QShortcut
+        self.window = window
+        self.title = window.windowTitle()
+        if self.mode == "action":
+            self.shortcut = QShortcut(QKeySequence(ACTION_SHORTCUT), window)
+            self.shortcut.activated.connect(self.toggle)
+            print(f"[profile] Press {ACTION_SHORTCUT} to start and stop recording an action")
+        self._show_state()
+
+    def toggle(self):
+        if self.recording:
+            self.end()
+        else:
+            self.begin()
+
+    def begin(self):
+        """Start recording"""
+        if self.recording:
+            return
+        self.recording = True
+        self.started = datetime.now()
+        self.start_time = time.perf_counter()
+        self.database_start = _database_totals(self.database())
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        # reset_peak() is Python 3.9+; without it an earlier trace's peak
+        # would leak into this recording, so it is not reported
+        self.peak_valid = self.started_tracing or hasattr(tracemalloc, "reset_peak")
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self.memory_start = self._memory_snapshot()
+        self.watchdog = StallWatchdog(self.stall_threshold)
+        self.watchdog.start()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        if self.mode == "action":
+            print("[profile] Recording...")
+        self._show_state()
+
+    def end(self):
+        """Stop recording and write the report; returns its path"""
+        if not self.recording:
+            return None
+        self.profile.disable()
+        self.watchdog.stop()
+        self.recording = False
+        duration = time.perf_counter() - self.start_time
+        memory_end = self._memory_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not self.peak_valid:
+            peak = None
+        if self.started_tracing:
+            tracemalloc.stop()
+        database_end = _database_totals(self.database())
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir,
+                            f"profile_{self.started:%Y%m%d_%H%M%S}_{self.mode}_{len(self.reports) + 1}")
+        self.profile.dump_stats(base + ".prof")
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(f"Hotel management system profile ({self.mode})\n")
+            f.write(f"Started {self.started:%Y-%m-%d %H:%M:%S}, recorded {duration:.2f} s, "
+                    f"Python {sys.version.split()[0]}\n")
+            f.write(f"Raw cProfile data: {os.path.basename(base)}.prof\n\n")
+            self._write_stalls(f)
+            self._write_database(f, database_end, duration)
+            self._write_cpu(f)
+            self._write_memory(f, memory_end, current, peak)
+        self.reports.append(base + ".txt")
+        print(f"[profile] Report written to {base}.txt")
+        self._show_state()
+        return base + ".txt"
+
+    def _show_state(self):
+        if self.window is not None:
+            suffix = " [profil kaydediliyor]" if self.recording else ""
+            self.window.setWindowTitle(self.title + suffix)
+
+    def _memory_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    def _write_stalls(self, f):
+        stalls = self.watchdog.stalls
+        total = sum(seconds for _, seconds, _ in stalls)
+        f.write(f"== Event-loop stalls of {self.stall_threshold * 1000:.0f} ms or more: "
+                f"{len(stalls)}, {total:.2f} s in total ==\n")
+        for offset, seconds, stack in sorted(stalls, key=lambda stall: -stall[1]):
+            f.write(f"\n{seconds * 1000:8.0f} ms stall at +{offset:.2f} s, GUI thread was in:\n")
+            f.write("".join("    " + line for line in "".join(stack).splitlines(True)))
+        f.write("\n")
+
+    def _write_database(self, f, database_end, duration):
+        rows = []
+        for key, (calls, seconds, count) in database_end.items():
+            start_calls, start_seconds, start_count = self.database_start.get(key, (0, 0.0, 0))
+            if calls > start_calls:
+                rows.append((seconds - start_seconds, key, calls - start_calls, count - start_count))
+        f.write("== Database time by operation and screen (all threads) ==\n")
+        if not rows:
+            f.write("(no database calls)\n\n")
+            return
+        f.write(f"{'operation':<28} {'screen':<24} {'calls':>7} {'total ms':>10} {'rows':>9}\n")
+        for seconds, (operation, screen), calls, count in sorted(rows, reverse=True)[:REPORT_LINES]:
+            f.write(f"{operation:<28} {screen:<24} {calls:>7} {seconds * 1000:>10.1f} {count:>9}\n")
+        total = sum(row[0] for row in rows)
+        f.write(f"{'total':<53} {total * 1000:>17.1f} ms ({total / duration:.0%} of the recording)\n\n")
+
+    def _write_cpu(self, f):
+        for order, title in (("cumulative", "cumulative time"), ("tottime", "own time")):
+            stream = io.StringIO()
+            pstats.Stats(self.profile, stream=stream).sort_stats(order).print_stats(REPORT_LINES)
+            f.write(f"== GUI thread CPU profile, top {REPORT_LINES} by {title} ==\n")
+            f.write(stream.getvalue().strip("\n") + "\n\n")
+
+    def _write_memory(self, f, memory_end, current, peak):
+        peak_text = "unknown" if peak is None else f"{peak / 1024 / 1024:.1f} MiB"
+        f.write(f"== Memory (tracemalloc): {current / 1024 / 1024:.1f} MiB traced at the end, "
+                f"peak {peak_text} ==\n")
+        f.write(f"Top {REPORT_LINES} allocation sites by growth during the recording:\n")
+        for stat in memory_end.compare_to(self.memory_start, "lineno")[:REPORT_LINES]:
+            f.write(f"  {stat}\n")
@@ -0,0 +1,97 @@
+"""
+Small builder for parameterised SELECT statements.
+
+Column names are checked against the columns the builder was created
+with, because they end up in the SQL text (ORDER BY cannot take a bound
+parameter); every value is passed as a parameter. Filters combine with
+AND, and ``after()`` continues a keyset-paginated listing from the sort
+key of the last row seen.
+"""
+
+OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'IN')
+
+class QueryBuilder:
+    """SELECT ... WHERE ... ORDER BY ... LIMIT over one table"""
+    
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = tuple(columns)
+        self._conditions = []
+        self._params = []
+        self._order = ()
+        self._descending = False
+        self._limit = None
+    
+    def _column(self, column):
+        if column not in self.columns:
+            raise ValueError(f"Unknown column for {self.table}: {column}")
+        return column
+    
+    def where(self, column, operator, value):
+        """Add ``column <operator> value``; IN takes a sequence of values"""
+        column = self._column(column)
+        if operator not in OPERATORS:
+            raise ValueError(f"Unsupported operator: {operator}")
+        if operator == 'IN':
+            values = list(value)
+            if not values:
+                # Nothing can match an empty set
+                self._conditions.append('0')
+                return self
+            self._conditions.append(f'{column} IN ({", ".join("?" for _ in values)})')
+            self._params.extend(values)
+        else:
+            self._conditions.append(f'{column} {operator} ?')
+            self._params.append(value)
+        return self
+    
+    def order_by(self, *columns, descending=False):
+        """Sort by the given columns, all in the same direction.
+        
+        The last column should be unique (normally ``id``) so the order is
+        total and ``after()`` never skips or repeats a row.
+        """
+        self._order = tuple(self._column(column) for column in columns)
+        self._descending = descending
+        return self
+    
+    def after(self, key):
+        """Only rows that sort after ``key``, the order_by() values of a row"""
+        if not self._order:
+            raise ValueError("after() needs order_by()")
+        if len(key) != len(self._order):
+            raise ValueError(f"Sort key needs {len(self._order)} values")
+        operator = '<' if self._descending else '>'
+        self._conditions.append(f'({", ".join(self._order)}) {operator} '
+                                f'({", ".join("?" for _ in key)})')
+        self._params.extend(key)
+        return self
+    
+    def limit(self, count):
+        self._limit = int(count)
+        return self
+    
+    def sort_key(self, row, columns=None):
+        """The order_by() values of ``row`` (a tuple of ``columns``)"""
+        columns = columns or self.columns
+        return tuple(row[columns.index(column)] for column in self._order)
+    
+    def _where(self):
+        return f' WHERE {" AND ".join(self._conditions)}' if self._conditions else ''
+    
+    def select(self, columns=None):
+        """Return ``(sql, params)`` for the query"""
+        columns = [self._column(column) for column in (columns or self.columns)]
+        sql = f'SELECT {", ".join(columns)} FROM {self.table}{self._where()}'
+        params = list(self._params)
+        if self._order:
+            direction = ' DESC' if self._descending else ''
+            sql += ' ORDER BY ' + ', '.join(f'{column}{direction}' for column in self._order)
+        if self._limit is not None:
+            sql += ' LIMIT ?'
+            params.append(self._limit)
+        return sql, params
+    
+    def count(self):
+        """Return ``(sql, params)`` counting the rows that pass the filters"""
+        return f'SELECT COUNT(*) FROM {self.table}{self._where()}', list(self._params)
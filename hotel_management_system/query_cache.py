@@ -0,0 +1,161 @@
+"""
+Read-through cache for HotelDatabase queries that are read far more
+often than they are written (cocktail recipes, today's menu, shift and
+special services).
+
+Each table has its own size-bounded LRU cache with a TTL. Writes through
+HotelDatabase invalidate the affected table straight away. Writes made by
+other terminals are noticed through ``PRAGMA data_version``, which
+changes whenever another connection commits to the file.
+"""
+
+import functools
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+# Per-table (max entries, TTL in seconds)
+DEFAULT_CACHE_SETTINGS = {
+    "cocktail_recipes": (8, 3600.0),
+    "menus": (16, 300.0),
+    "shifts": (16, 300.0),
+    "special_services": (16, 60.0),
+}
+
+class TTLCache:
+    """LRU cache with a maximum size whose entries expire after ``ttl`` seconds"""
+    
+    def __init__(self, maxsize=128, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by clear() so a value read before an invalidation is not stored after it
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+    
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+    
+    def __len__(self):
+        return len(self._data)
+
+class DataVersionWatcher:
+    """Detects commits made through other connections to the same file"""
+    
+    def __init__(self, db_name, min_interval=0.0):
+        self.min_interval = min_interval
+        self._conn = sqlite3.connect(db_name, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._version = self._read()
+        self._checked_at = time.monotonic()
+    
+    def _read(self):
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+    
+    def changed(self):
+        """True if anyone else committed since the previous call"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.min_interval:
+                return False
+            self._checked_at = now
+            try:
+                version = self._read()
+            except sqlite3.Error:
+                return True
+            if version != self._version:
+                self._version = version
+                return True
+            return False
+    
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class QueryCache:
+    """Per-table TTL/LRU caches with write and cross-process invalidation"""
+    
+    def __init__(self, db_name, settings=None, watch_interval=0.0):
+        settings = settings or DEFAULT_CACHE_SETTINGS
+        self.tables = {table: TTLCache(maxsize, ttl)
+                       for table, (maxsize, ttl) in settings.items()}
+        self.watcher = DataVersionWatcher(db_name, watch_interval)
+    
+    def get(self, table, key):
+        if self.watcher.changed():
+            self.clear()
+        return self.tables[table].get(key)
+    
+    def generation(self, table):
+        return self.tables[table].generation
+    
+    def set(self, table, key, value, generation=None):
+        self.tables[table].set(key, value, generation)
+    
+    def invalidate(self, *tables):
+        for table in tables:
+            self.tables[table].clear()
+    
+    def clear(self):
+        for cache in self.tables.values():
+            cache.clear()
+    
+    def stats(self):
+        """Hits, misses and size for each table"""
+        return {table: {"hits": c.hits, "misses": c.misses, "size": len(c)}
+                for table, c in self.tables.items()}
+    
+    def close(self):
+        self.watcher.close()
+
+def cached(table):
+    """Serve a HotelDatabase read method from ``self.cache`` when possible.
+    
+    The key includes today's date so the ``get_today_*`` methods roll over
+    at midnight. Failures are not cached because they raise through here.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            key = (method.__name__, time.strftime('%Y-%m-%d'), args, tuple(sorted(kwargs.items())))
+            value = cache.get(table, key)
+            if value is _MISSING:
+                generation = cache.generation(table)
+                value = method(self, *args, **kwargs)
+                cache.set(table, key, value, generation)
+            # Hand out copies of lists so callers cannot change the cached value
+            return list(value) if isinstance(value, list) else value
+        return wrapper
+    return decorator
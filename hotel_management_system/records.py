@@ -0,0 +1,56 @@
+"""
+Row types for HotelDatabase results
+
+Each table has a named tuple over an explicit column list, and the
+queries select exactly those columns instead of ``SELECT *``: a column
+added to a table later is not dragged into every list, and a query can
+name only the columns its screen shows. Callers read fields by name
+(``fault.fault_status``, ``recipe.ingredients``).
+
+Records are still tuples, so they compare, sort, cache and index like
+the plain rows (``fault[0]`` keeps working), and ``_asdict()`` gives the
+JSON form. Rows are wrapped with to_records(), which makes no Python call
+per row. A record is the same size as the tuple it replaces, but the
+wrapped list is not free: each row is copied once, so the fetched rows
+and the records coexist until the copy finishes, and the kept result
+measures a few percent more per row than plain tuples. ``benchmark.py``
+reports both the held and the peak bytes per row.
+"""
+
+import functools
+from collections import namedtuple
+
+FAULT_COLUMNS = ('id', 'date', 'room_number', 'reporter', 'fault_description', 'fault_status')
+SHIFT_COLUMNS = ('id', 'date', 'working_staff', 'on_leave', 'cover_color')
+SPECIAL_SERVICE_COLUMNS = ('id', 'date', 'service_description', 'status')
+MENU_COLUMNS = ('id', 'date', 'food_menu')
+COCKTAIL_COLUMNS = ('id', 'name', 'recipe', 'ingredients')
+
+# Values the screens offer for fault_status and the special service status;
+# the first one is the default for a new row
+FAULT_STATUSES = ("Bekleniyor", "Çözüldü", "Çözülemedi")
+SERVICE_STATUSES = ("Beklemede", "Tamamlandı", "İptal")
+
+Fault = namedtuple('Fault', FAULT_COLUMNS)
+Shift = namedtuple('Shift', SHIFT_COLUMNS)
+SpecialService = namedtuple('SpecialService', SPECIAL_SERVICE_COLUMNS)
+Menu = namedtuple('Menu', MENU_COLUMNS)
+CocktailRecipe = namedtuple('CocktailRecipe', COCKTAIL_COLUMNS)
+
+@functools.lru_cache(maxsize=None)
+def _maker(record):
+    # tuple.__new__ reuses the fetched values without calling Python code
+    return functools.partial(tuple.__new__, record)
+
+def select_list(record, alias=None):
+    """The columns of ``record`` for a SELECT, optionally qualified by ``alias``"""
+    prefix = f'{alias}.' if alias else ''
+    return ', '.join(prefix + column for column in record._fields)
+
+def to_record(record, row):
+    """Wrap one fetched row, passing None through"""
+    return None if row is None else _maker(record)(row)
+
+def to_records(record, rows):
+    """Wrap fetched rows, which must hold the columns of ``record`` in order"""
+    return list(map(_maker(record), rows))
@@ -2,6 +2,9 @@
 """
 Hotel Management System Launcher
 Simple launcher script with error handling and system checks
+
+Options of main.py such as --profile, --profile-startup and
+--metrics-file are passed on to the application.
 """
 
 import sys
@@ -55,7 +58,7 @@ def install_requirements():
         return False
 
 def run_database_test():
-    """Run database test"""
+    """Run the full database test (uses a temporary database)"""
     try:
         print("\n🧪 Running database test...")
         subprocess.check_call([sys.executable, "test_database.py"])
@@ -64,6 +67,18 @@ def run_database_test():
         print("❌ Database test failed")
         return False
 
+def run_health_check():
+    """Quick in-process check of hotel.db; quick_check is cached while the file is unchanged"""
+    from health_check import check_database
+    ok, problems, cached = check_database("hotel.db")
+    if ok:
+        print("✅ Database health check passed" + (" (integrity check cached)" if cached else ""))
+    else:
+        print("❌ Database health check failed:")
+        for problem in problems:
+            print(f"   - {problem}")
+    return ok
+
 def main():
     """Main launcher function"""
     print("🏨 Hotel Management System Launcher")
@@ -92,12 +107,16 @@ def main():
             print("💡 To run the GUI application, use a system with display support.")
         sys.exit(0)
     
-    # Run database test first
-    print("\n🧪 Testing database functionality...")
-    if not run_database_test():
+    # Check the database (the full test only runs when asked for)
+    if "--full-test" in sys.argv and not run_database_test():
         print("❌ Database test failed. Please check the error messages above.")
         sys.exit(1)
     
+    print("\n🩺 Checking database...")
+    if not run_health_check():
+        print("❌ Database check failed. Please check the error messages above.")
+        sys.exit(1)
+    
     print("\n🚀 Starting Hotel Management System...")
     print("=" * 50)
     
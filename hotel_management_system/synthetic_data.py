@@ -0,0 +1,102 @@
+"""
+Seeded synthetic hotel data for benchmarks and load tests
+
+The same seed always gives the same rows, so results from different
+versions are measured on identical data. Faults are spread over several
+years across every room of a nine-floor hotel, in reporting order; older
+faults are mostly closed and recent ones mostly pending, as in a real
+database. Every day of the period gets a shift, a menu and a few special
+services, including today so the "today" lookups find something.
+"""
+
+import random
+from datetime import date, timedelta
+
+FLOORS = range(1, 10)
+ROOMS_PER_FLOOR = 40
+ROOMS = [f"{floor}{room:02d}" for floor in FLOORS for room in range(1, ROOMS_PER_FLOOR + 1)]
+
+REPORTERS = ["F/O", "HK", "F&B", "Animasyon", "Diğer"]
+REPORTER_WEIGHTS = [25, 45, 15, 5, 10]
+
+FAULT_DESCRIPTIONS = [
+    "Klima çalışmıyor", "Klima su damlatıyor", "Musluk damlatıyor", "Lavabo tıkalı",
+    "Klozet sifonu çalışmıyor", "Duş başlığı kırık", "Sıcak su gelmiyor",
+    "TV kumandası bozuk", "TV açılmıyor", "Elektrik prizi çalışmıyor", "Ampul yanmış",
+    "Kapı kartı okumuyor", "Balkon kapısı sıkışıyor", "Minibar soğutmuyor",
+    "Saç kurutma makinesi bozuk", "Wi-Fi bağlantı sorunu", "Kasa açılmıyor",
+    "Perde rayı kırık", "Telefon çalışmıyor", "Havlu askısı düşmüş",
+]
+
+STAFF = ["Ahmet", "Ayşe", "Mehmet", "Fatma", "Mustafa", "Zeynep", "Emre", "Elif",
+         "Hakan", "Gül", "Burak", "Selin", "Okan", "Derya", "Serkan", "Merve"]
+COVER_COLORS = ["Kırmızı", "Mavi", "Yeşil", "Sarı", "Mor", "Turuncu"]
+
+DISHES = ["Mercimek çorbası", "Ezogelin çorbası", "Izgara köfte", "Tavuk şiş",
+          "Karnıyarık", "Mantı", "Levrek buğulama", "Pilav", "Cacık", "Çoban salatası",
+          "Zeytinyağlı fasulye", "İmam bayıldı", "Baklava", "Sütlaç", "Künefe"]
+
+SERVICE_DESCRIPTIONS = [
+    "Doğum günü pastası", "Balayı odası süslemesi", "Odaya kahvaltı servisi",
+    "Ekstra yastık ve battaniye", "Havalimanı transferi", "Bebek yatağı",
+    "Geç çıkış talebi", "Odaya şampanya", "Glutensiz menü", "Evlilik teklifi hazırlığı",
+]
+SERVICE_STATUSES = ["Beklemede", "Tamamlandı", "İptal"]
+
+# Faults reported within this many days are mostly still pending
+RECENT_DAYS = 14
+
+def _days(years, today):
+    today = today or date.today()
+    count = int(years * 365)
+    return [today - timedelta(days=count - 1 - offset) for offset in range(count)]
+
+def generate_faults(count, seed=0, years=3, today=None):
+    """Yield ``count`` fault rows (date, room, reporter, description, status), oldest first"""
+    rng = random.Random(f"faults-{seed}")
+    today = today or date.today()
+    span = int(years * 365)
+    recent = today - timedelta(days=RECENT_DAYS)
+    for i in range(count):
+        day = today - timedelta(days=span - 1 - (i * span) // count)
+        if day >= recent:
+            status = rng.choices(["Bekleniyor", "Çözüldü", "Çözülemedi"], [60, 35, 5])[0]
+        else:
+            status = rng.choices(["Bekleniyor", "Çözüldü", "Çözülemedi"], [3, 87, 10])[0]
+        yield (day.strftime('%Y-%m-%d'),
+               rng.choice(ROOMS),
+               rng.choices(REPORTERS, REPORTER_WEIGHTS)[0],
+               f"{rng.choice(FAULT_DESCRIPTIONS)} ({i})",
+               status)
+
+def generate_shifts(seed=0, years=3, today=None):
+    """Yield one shift (date, working_staff, on_leave, cover_color) per day"""
+    rng = random.Random(f"shifts-{seed}")
+    for day in _days(years, today):
+        staff = rng.sample(STAFF, 10)
+        yield (day.strftime('%Y-%m-%d'), ", ".join(staff[:8]), ", ".join(staff[8:]),
+               rng.choice(COVER_COLORS))
+
+def generate_menus(seed=0, years=3, today=None):
+    """Yield one menu (date, food_menu) per day"""
+    rng = random.Random(f"menus-{seed}")
+    for day in _days(years, today):
+        yield day.strftime('%Y-%m-%d'), "\n".join(rng.sample(DISHES, 6))
+
+def generate_special_services(per_day=5, seed=0, years=3, today=None):
+    """Yield about ``per_day`` special services (date, description, status) per day"""
+    rng = random.Random(f"services-{seed}")
+    for day in _days(years, today):
+        for _ in range(rng.randint(0, 2 * per_day)):
+            yield (day.strftime('%Y-%m-%d'), rng.choice(SERVICE_DESCRIPTIONS),
+                   rng.choice(SERVICE_STATUSES))
+
+def populate(db, faults, seed=0, years=3, services_per_day=5, today=None, progress=None):
+    """Fill ``db`` with a synthetic hotel; returns the number of rows per table"""
+    counts = {"faults": db.add_faults_bulk(generate_faults(faults, seed, years, today),
+                                           progress=progress)}
+    counts["special_services"] = db.add_special_services_bulk(
+        generate_special_services(services_per_day, seed, years, today))
+    counts["shifts"] = db.add_shifts_bulk(generate_shifts(seed, years, today))
+    counts["menus"] = db.add_menus_bulk(generate_menus(seed, years, today))
+    return counts
@@ -1,17 +1,26 @@
 import sys
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
-                             QTableWidget, QTableWidgetItem, QDialog, QFormLayout,
+                             QTableView, QDialog, QFormLayout,
                              QLineEdit, QComboBox, QTextEdit, QLabel, QMessageBox,
-                             QHeaderView, QDialogButtonBox)
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QFont
+                             QHeaderView, QDialogButtonBox, QCheckBox, QDateEdit)
+from PyQt5.QtCore import (Qt, pyqtSignal, QAbstractTableModel, QModelIndex, QPoint, QTimer,
+                          QDate)
+from PyQt5.QtGui import QFont, QBrush
 from datetime import datetime
-from database import HotelDatabase
+from database import FAULT_COLUMNS, fault_matches, fault_sort_key, get_database
+from records import Fault
+from db_workers import DatabaseTaskRunner
+from change_feed import shared_poller
+from ui_fault_stats import FaultStatsPanel
 
 class FaultDetailsDialog(QDialog):
+    # The Fault with its new status
+    fault_updated = pyqtSignal(object)
+    
     def __init__(self, fault_data, parent=None):
         super().__init__(parent)
         self.fault_data = fault_data
+        self.runner = DatabaseTaskRunner(self)
         self.init_ui()
     
     def init_ui(self):
@@ -21,19 +30,19 @@ class FaultDetailsDialog(QDialog):
         layout = QFormLayout()
         
         # Create read-only fields
-        date_label = QLabel(self.fault_data[1])  # date
-        room_label = QLabel(self.fault_data[2])  # room_number
-        reporter_label = QLabel(self.fault_data[3])  # reporter
-        description_label = QLabel(self.fault_data[4])  # fault_description
+        date_label = QLabel(self.fault_data.date)
+        room_label = QLabel(self.fault_data.room_number)
+        reporter_label = QLabel(self.fault_data.reporter)
+        description_label = QLabel(self.fault_data.fault_description)
         description_label.setWordWrap(True)
-        status_label = QLabel(self.fault_data[5])  # fault_status
+        status_label = QLabel(self.fault_data.fault_status)
         
         # Style the status label based on status
-        if self.fault_data[5] == "Bekleniyor":
+        if self.fault_data.fault_status == "Bekleniyor":
             status_label.setStyleSheet("color: orange; font-weight: bold;")
-        elif self.fault_data[5] == "Çözüldü":
+        elif self.fault_data.fault_status == "Çözüldü":
             status_label.setStyleSheet("color: green; font-weight: bold;")
-        elif self.fault_data[5] == "Çözülemedi":
+        elif self.fault_data.fault_status == "Çözülemedi":
             status_label.setStyleSheet("color: red; font-weight: bold;")
         
         layout.addRow("Tarih:", date_label)
@@ -45,34 +54,45 @@ class FaultDetailsDialog(QDialog):
         # Add status update section
         self.status_combo = QComboBox()
         self.status_combo.addItems(["Bekleniyor", "Çözüldü", "Çözülemedi"])
-        self.status_combo.setCurrentText(self.fault_data[5])
+        self.status_combo.setCurrentText(self.fault_data.fault_status)
         layout.addRow("Durumu Güncelle:", self.status_combo)
         
         # Buttons
-        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-        button_box.accepted.connect(self.update_status)
-        button_box.rejected.connect(self.reject)
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.update_status)
+        self.button_box.rejected.connect(self.reject)
         
-        layout.addRow(button_box)
+        layout.addRow(self.button_box)
         self.setLayout(layout)
     
     def update_status(self):
         new_status = self.status_combo.currentText()
-        if new_status != self.fault_data[5]:
-            db = HotelDatabase()
-            if db.update_fault_status(self.fault_data[0], new_status):
-                QMessageBox.information(self, "Başarılı", "Arıza durumu güncellendi!")
-                self.accept()
-            else:
-                QMessageBox.warning(self, "Hata", "Arıza durumu güncellenemedi!")
+        if new_status != self.fault_data.fault_status:
+            self.button_box.setEnabled(False)
+            self.runner.submit("update_status", get_database().update_fault_status,
+                               self.fault_data.id, new_status,
+                               on_result=self.on_status_updated,
+                               on_error=lambda message: self.on_status_updated(0))
         else:
             self.accept()
+    
+    def on_status_updated(self, rowcount):
+        self.button_box.setEnabled(True)
+        if rowcount:
+            QMessageBox.information(self, "Başarılı", "Arıza durumu güncellendi!")
+            self.fault_updated.emit(self.fault_data._replace(
+                fault_status=self.status_combo.currentText()))
+            self.accept()
+        else:
+            QMessageBox.warning(self, "Hata", "Arıza durumu güncellenemedi!")
 
 class AddFaultDialog(QDialog):
-    fault_added = pyqtSignal()
+    # The new Fault, including the id assigned by the database
+    fault_added = pyqtSignal(object)
     
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.runner = DatabaseTaskRunner(self)
         self.init_ui()
     
     def init_ui(self):
@@ -111,11 +131,11 @@ class AddFaultDialog(QDialog):
         layout.addRow("Durum:", self.status_combo)
         
         # Buttons
-        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
-        button_box.accepted.connect(self.add_fault)
-        button_box.rejected.connect(self.reject)
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.add_fault)
+        self.button_box.rejected.connect(self.reject)
         
-        layout.addRow(button_box)
+        layout.addRow(self.button_box)
         self.setLayout(layout)
     
     def add_fault(self):
@@ -128,29 +148,242 @@ class AddFaultDialog(QDialog):
             QMessageBox.warning(self, "Hata", "Arıza açıklaması boş olamaz!")
             return
         
-        # Add fault to database
-        db = HotelDatabase()
-        success = db.add_fault(
+        # Add fault to database in the background
+        self.button_box.setEnabled(False)
+        self.new_fault = (
             self.date_edit.text(),
             self.room_edit.text().strip(),
             self.reporter_combo.currentText(),
             self.description_edit.toPlainText().strip(),
-            self.status_combo.currentText()
+            self.status_combo.currentText(),
         )
-        
-        if success:
+        self.runner.submit(
+            "add_fault",
+            get_database().add_fault,
+            *self.new_fault,
+            on_result=self.on_fault_saved,
+            on_error=lambda message: self.on_fault_saved(None)
+        )
+    
+    def on_fault_saved(self, fault_id):
+        self.button_box.setEnabled(True)
+        if fault_id:
             QMessageBox.information(self, "Başarılı", "Arıza başarıyla kaydedildi!")
-            self.fault_added.emit()
+            self.fault_added.emit(Fault(fault_id, *self.new_fault))
             self.accept()
         else:
             QMessageBox.warning(self, "Hata", "Arıza kaydedilemedi!")
 
+class FaultTableModel(QAbstractTableModel):
+    """Fault list backed by the database, loaded one page at a time.
+    
+    The view calls canFetchMore()/fetchMore() as the user scrolls, so only
+    the rows seen so far are ever read from SQLite or kept in memory.
+    Filtering and header-click sorting are done by SQLite as well.
+    """
+    
+    # Emitted when the user picks another sort order
+    sortChanged = pyqtSignal()
+    
+    HEADERS = ["ID", "Tarih", "Oda No", "Bildiren", "Açıklama", "Durum"]
+    STATUS_COLUMN = 5
+    STATUS_BRUSHES = {
+        "Bekleniyor": QBrush(Qt.yellow),
+        "Çözüldü": QBrush(Qt.green),
+        "Çözülemedi": QBrush(Qt.red),
+    }
+    
+    def __init__(self, db, page_size=200, parent=None, runner=None):
+        super().__init__(parent)
+        self.db = db
+        self.page_size = page_size
+        # With a runner pages are read on a worker thread; without one
+        # (benchmarks, tests) they are read synchronously.
+        self.runner = runner
+        self.status = None
+        self.filters = {}
+        # None sorts search results by relevance
+        self.sort_column = 'date'
+        self.descending = True
+        # Search text while showing search results instead of the paged list
+        self.query = None
+        self._faults = []
+        self._cursor = None
+        self._has_more = False
+        self._fetching = False
+    
+    def load(self, status=None, filters=None):
+        """Start over with faults of the given status (None for all) and filters"""
+        if self.runner:
+            self.runner.cancel("fault_page")
+        self.beginResetModel()
+        self.status = status
+        self.filters = dict(filters or {})
+        self.query = None
+        if self.sort_column is None:
+            self.sort_column, self.descending = 'date', True
+        self._faults = []
+        self._cursor = None
+        self._has_more = True
+        self._fetching = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+    
+    def show_results(self, query, status, faults, filters=None):
+        """Show search results (already ordered) in place of the paged list"""
+        if self.runner:
+            self.runner.cancel("fault_page")
+        self.beginResetModel()
+        self.status = status
+        self.filters = dict(filters or {})
+        self.query = query
+        self._faults = list(faults)
+        self._cursor = None
+        self._has_more = False
+        self._fetching = False
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._faults)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self._faults[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return str(value)
+        if role == Qt.BackgroundRole and index.column() == self.STATUS_COLUMN:
+            return self.STATUS_BRUSHES.get(value)
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Re-query in the order of the clicked column"""
+        if column < 0:
+            return
+        sort_column = FAULT_COLUMNS[column]
+        descending = order == Qt.DescendingOrder
+        if (sort_column, descending) == (self.sort_column, self.descending):
+            return
+        self.sort_column, self.descending = sort_column, descending
+        self.sortChanged.emit()
+        if self.query is None:
+            self.load(self.status, self.filters)
+    
+    def sort_section(self):
+        """Header section and order of the current sort, section -1 for relevance"""
+        if self.sort_column is None:
+            return -1, Qt.DescendingOrder
+        return (FAULT_COLUMNS.index(self.sort_column),
+                Qt.DescendingOrder if self.descending else Qt.AscendingOrder)
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._fetching
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._has_more or self._fetching:
+            return
+        args = (self.page_size, self._cursor, self.status, self.filters,
+                self.sort_column, self.descending)
+        if self.runner is None:
+            self._append_page(self.db.get_faults_page(*args))
+            return
+        self._fetching = True
+        self.runner.submit("fault_page", self.db.get_faults_page, *args,
+                           on_result=self._append_page)
+    
+    def _append_page(self, page):
+        faults, self._cursor = page
+        self._fetching = False
+        self._has_more = self._cursor is not None
+        # A pushed change may already have inserted some of these rows
+        present = {fault.id for fault in self._faults}
+        faults = [fault for fault in faults if fault.id not in present]
+        if faults:
+            first = len(self._faults)
+            self.beginInsertRows(QModelIndex(), first, first + len(faults) - 1)
+            self._faults.extend(faults)
+            self.endInsertRows()
+    
+    def fault_id(self, row):
+        """Database id of the fault shown in the given row"""
+        return self._faults[row].id
+    
+    def row_of(self, fault_id):
+        """Row currently showing the fault, or None"""
+        for row, fault in enumerate(self._faults):
+            if fault.id == fault_id:
+                return row
+        return None
+    
+    def _matches(self, fault):
+        return fault_matches(fault, dict(self.filters, status=self.status))
+    
+    def _sort_key(self, fault):
+        return tuple(getattr(fault, column) for column in fault_sort_key(self.sort_column))
+    
+    def _insert_sorted(self, fault):
+        # Same order as the query; rows past the loaded window are left
+        # for fetchMore() to bring in
+        key = self._sort_key(fault)
+        row = 0
+        while row < len(self._faults) and (
+                self._sort_key(self._faults[row]) > key if self.descending
+                else self._sort_key(self._faults[row]) < key):
+            row += 1
+        if row == len(self._faults) and self._has_more:
+            return
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._faults.insert(row, fault)
+        self.endInsertRows()
+    
+    def remove_fault(self, fault_id):
+        row = self.row_of(fault_id)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._faults[row]
+            self.endRemoveRows()
+    
+    def apply_changes(self, faults, deleted_ids=()):
+        """Patch the loaded rows with changed faults instead of reloading"""
+        for fault_id in deleted_ids:
+            self.remove_fault(fault_id)
+        for fault in faults:
+            row = self.row_of(fault.id)
+            if row is None:
+                # Search results are ranked by the database, not by date
+                if self._matches(fault) and self.query is None:
+                    self._insert_sorted(fault)
+            elif not self._matches(fault):
+                self.remove_fault(fault.id)
+            elif self.query is None and self._sort_key(self._faults[row]) != self._sort_key(fault):
+                # The sort key changed, so the row's position may have too
+                self.remove_fault(fault.id)
+                self._insert_sorted(fault)
+            else:
+                self._faults[row] = fault
+                self.dataChanged.emit(self.index(row, 0),
+                                      self.index(row, self.columnCount() - 1))
+
 class FaultManagementWidget(QWidget):
+    # Wait this long after the last keystroke before searching
+    SEARCH_DELAY_MS = 300
+    SEARCH_LIMIT = 200
+    
     def __init__(self):
         super().__init__()
-        self.db = HotelDatabase()
+        self.db = get_database()
+        self.runner = DatabaseTaskRunner(self)
         self.init_ui()
         self.load_pending_faults()
+        shared_poller().faults_changed.connect(self.on_faults_changed)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -212,19 +445,99 @@ class FaultManagementWidget(QWidget):
         """)
         self.pending_faults_btn.clicked.connect(self.load_pending_faults)
         
+        self.stats_btn = QPushButton("İstatistikler")
+        self.stats_btn.setCheckable(True)
+        self.stats_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #9C27B0;
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                font-size: 14px;
+                border-radius: 5px;
+            }
+            QPushButton:hover, QPushButton:checked {
+                background-color: #7B1FA2;
+            }
+        """)
+        
         button_layout.addWidget(self.report_fault_btn)
         button_layout.addWidget(self.all_faults_btn)
         button_layout.addWidget(self.pending_faults_btn)
         button_layout.addStretch()
+        button_layout.addWidget(self.stats_btn)
         
         layout.addLayout(button_layout)
         
+        # Dashboard figures, read from the counters only while shown
+        self.stats_panel = FaultStatsPanel()
+        self.stats_panel.setVisible(False)
+        self.stats_btn.toggled.connect(self.stats_panel.setVisible)
+        layout.addWidget(self.stats_panel)
+        
+        # Search box, searched as the user types
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Ara: açıklama, oda numarası veya bildiren...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.refresh_view)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+        layout.addWidget(self.search_edit)
+        
+        # Filters, applied by SQLite
+        filter_layout = QHBoxLayout()
+        
+        self.status_filter = QComboBox()
+        self.status_filter.addItems(["Tümü", "Bekleniyor", "Çözüldü", "Çözülemedi"])
+        self.status_filter.currentTextChanged.connect(self.refresh_view)
+        
+        self.room_filter = QLineEdit()
+        self.room_filter.setPlaceholderText("Tümü")
+        self.room_filter.setMaximumWidth(80)
+        self.room_filter.textChanged.connect(self.search_timer.start)
+        
+        self.reporter_filter = QComboBox()
+        self.reporter_filter.addItems(["Tümü", "F/O", "HK", "F&B", "Animasyon", "Diğer"])
+        self.reporter_filter.currentTextChanged.connect(self.refresh_view)
+        
+        self.date_filter = QCheckBox("Tarih:")
+        self.date_from_edit = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.date_to_edit = QDateEdit(QDate.currentDate())
+        for date_edit in (self.date_from_edit, self.date_to_edit):
+            date_edit.setCalendarPopup(True)
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setEnabled(False)
+            date_edit.dateChanged.connect(self.refresh_view)
+            self.date_filter.toggled.connect(date_edit.setEnabled)
+        self.date_filter.toggled.connect(self.refresh_view)
+        
+        filter_layout.addWidget(QLabel("Durum:"))
+        filter_layout.addWidget(self.status_filter)
+        filter_layout.addWidget(QLabel("Oda:"))
+        filter_layout.addWidget(self.room_filter)
+        filter_layout.addWidget(QLabel("Bildiren:"))
+        filter_layout.addWidget(self.reporter_filter)
+        filter_layout.addWidget(self.date_filter)
+        filter_layout.addWidget(self.date_from_edit)
+        filter_layout.addWidget(QLabel("-"))
+        filter_layout.addWidget(self.date_to_edit)
+        filter_layout.addStretch()
+        layout.addLayout(filter_layout)
+        
         # Table
-        self.fault_table = QTableWidget()
-        self.fault_table.setColumnCount(6)
-        self.fault_table.setHorizontalHeaderLabels([
-            "ID", "Tarih", "Oda No", "Bildiren", "Açıklama", "Durum"
-        ])
+        self.fault_model = FaultTableModel(self.db, parent=self, runner=self.runner)
+        self.fault_table = QTableView()
+        self.fault_table.setModel(self.fault_model)
+        self.fault_table.setSelectionBehavior(QTableView.SelectRows)
+        self.fault_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.fault_table.verticalHeader().setVisible(False)
+        
+        # Header clicks re-query in that order; start newest first
+        self.fault_table.horizontalHeader().setSortIndicator(1, Qt.DescendingOrder)
+        self.fault_table.setSortingEnabled(True)
+        self.fault_model.sortChanged.connect(self.on_sort_changed)
         
         # Set column widths
         header = self.fault_table.horizontalHeader()
@@ -237,12 +550,12 @@ class FaultManagementWidget(QWidget):
         
         # Style the table
         self.fault_table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 gridline-color: #d0d0d0;
                 background-color: white;
                 alternate-background-color: #f5f5f5;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px;
             }
             QHeaderView::section {
@@ -267,52 +580,132 @@ class FaultManagementWidget(QWidget):
     
     def load_pending_faults(self):
         """Load pending faults into table"""
-        faults = self.db.get_pending_faults()
-        self.populate_table(faults)
-        self.status_label.setText(f"Bekleyen arızalar gösteriliyor ({len(faults)} adet)")
+        self.set_status_filter("Bekleniyor")
     
     def load_all_faults(self):
         """Load all faults into table"""
-        faults = self.db.get_all_faults()
-        self.populate_table(faults)
-        self.status_label.setText(f"Tüm arızalar gösteriliyor ({len(faults)} adet)")
-    
-    def populate_table(self, faults):
-        """Populate table with fault data"""
-        self.fault_table.setRowCount(len(faults))
-        
-        for row, fault in enumerate(faults):
-            for col, data in enumerate(fault):
-                item = QTableWidgetItem(str(data))
-                
-                # Color code status column
-                if col == 5:  # Status column
-                    if data == "Bekleniyor":
-                        item.setBackground(Qt.yellow)
-                    elif data == "Çözüldü":
-                        item.setBackground(Qt.green)
-                    elif data == "Çözülemedi":
-                        item.setBackground(Qt.red)
-                
-                self.fault_table.setItem(row, col, item)
+        self.set_status_filter(None)
+    
+    def set_status_filter(self, status):
+        self.status_filter.blockSignals(True)
+        self.status_filter.setCurrentText(status or "Tümü")
+        self.status_filter.blockSignals(False)
+        self.refresh_view()
+    
+    def current_status(self):
+        status = self.status_filter.currentText()
+        return None if status == "Tümü" else status
+    
+    def current_filters(self):
+        """Filters other than status, as accepted by HotelDatabase.get_faults_page()"""
+        filters = {}
+        if self.room_filter.text().strip():
+            filters['room_number'] = self.room_filter.text().strip()
+        if self.reporter_filter.currentText() != "Tümü":
+            filters['reporter'] = self.reporter_filter.currentText()
+        if self.date_filter.isChecked():
+            filters['date_from'] = self.date_from_edit.date().toString("yyyy-MM-dd")
+            filters['date_to'] = self.date_to_edit.date().toString("yyyy-MM-dd")
+        return filters
+    
+    def view_description(self, status, filters):
+        if status == "Bekleniyor":
+            text = "Bekleyen arızalar"
+        elif status:
+            text = f"{status} durumundaki arızalar"
+        else:
+            text = "Tüm arızalar"
+        return text + (" (filtreli)" if filters else "")
+    
+    def refresh_view(self):
+        """Show the faults passing the filters, narrowed by the search box if filled"""
+        self.search_timer.stop()
+        status = self.current_status()
+        filters = self.current_filters()
+        query = self.search_edit.text().strip()
+        if query:
+            if query != self.fault_model.query:
+                # A new search starts out sorted by relevance
+                self.fault_model.sort_column = None
+                self.fault_table.horizontalHeader().setSortIndicator(-1, Qt.DescendingOrder)
+            self.search_faults(query, status, filters)
+            return
+        self.runner.cancel("fault_search")
+        self.fault_model.load(status, filters)
+        self.fault_table.horizontalHeader().setSortIndicator(*self.fault_model.sort_section())
+        self.status_label.setText(f"{self.view_description(status, filters)} gösteriliyor")
+        self.refresh_count()
+    
+    def on_sort_changed(self):
+        # The model re-queries the paged list itself; search results are re-run here
+        if self.fault_model.query is not None:
+            self.search_faults(self.fault_model.query, self.fault_model.status,
+                               self.fault_model.filters)
+    
+    def search_faults(self, query, status, filters):
+        self.runner.submit("fault_search", self.db.search_faults, query, status,
+                           limit=self.SEARCH_LIMIT, filters=filters,
+                           sort=self.fault_model.sort_column,
+                           descending=self.fault_model.descending,
+                           on_result=lambda faults: self.show_search_results(
+                               query, status, filters, faults))
+    
+    def show_search_results(self, query, status, filters, faults):
+        self.runner.cancel("fault_count")
+        self.fault_model.show_results(query, status, faults, filters)
+        scope = self.view_description(status, filters).lower()
+        more = "+" if len(faults) >= self.SEARCH_LIMIT else ""
+        self.status_label.setText(f"\"{query}\" için {scope} içinde {len(faults)}{more} sonuç")
+    
+    def on_faults_changed(self, faults, deleted_ids=()):
+        """Apply changed faults to the open view without reloading it.
+        
+        Selection follows its rows through the model's insert/remove
+        signals; the scroll position is kept on the row that was at the
+        top of the view unless the view was scrolled to the very top.
+        """
+        top = self.fault_table.indexAt(QPoint(0, 0))
+        top_id = self.fault_model.fault_id(top.row()) if top.isValid() and top.row() > 0 else None
+        
+        self.fault_model.apply_changes(faults, deleted_ids)
+        if self.fault_model.query is not None:
+            # Rows new to the results can only be ranked by searching again
+            if any(self.fault_model.row_of(fault.id) is None and self.fault_model._matches(fault)
+                   for fault in faults):
+                self.search_faults(self.fault_model.query, self.fault_model.status,
+                                   self.fault_model.filters)
+            return
+        
+        if top_id is not None:
+            row = self.fault_model.row_of(top_id)
+            if row is not None:
+                self.fault_table.scrollTo(self.fault_model.index(row, 0),
+                                          QTableView.PositionAtTop)
+        self.refresh_count()
+    
+    def refresh_count(self):
+        """Re-count the faults of the current view for the status label"""
+        status, filters = self.fault_model.status, self.fault_model.filters
+        description = self.view_description(status, filters)
+        self.runner.submit("fault_count", self.db.count_faults, status, filters,
+                           on_result=lambda count: self.status_label.setText(
+                               f"{description} gösteriliyor ({count} adet)"))
     
     def show_fault_details(self, index):
         """Show fault details dialog"""
-        row = index.row()
-        fault_id = int(self.fault_table.item(row, 0).text())
-        fault_data = self.db.get_fault_by_id(fault_id)
-        
+        fault_id = self.fault_model.fault_id(index.row())
+        self.runner.submit("fault_details", self.db.get_fault_by_id, fault_id,
+                           on_result=self.open_fault_details)
+    
+    def open_fault_details(self, fault_data):
+        """Open the details dialog once the fault has been read"""
         if fault_data:
             dialog = FaultDetailsDialog(fault_data, self)
-            if dialog.exec_() == QDialog.Accepted:
-                # Refresh the current view
-                if "Bekleyen" in self.status_label.text():
-                    self.load_pending_faults()
-                else:
-                    self.load_all_faults()
+            dialog.fault_updated.connect(lambda fault: self.on_faults_changed([fault]))
+            dialog.exec_()
     
     def open_add_fault_dialog(self):
         """Open add fault dialog"""
         dialog = AddFaultDialog(self)
-        dialog.fault_added.connect(self.load_pending_faults)
+        dialog.fault_added.connect(lambda fault: self.on_faults_changed([fault]))
         dialog.exec_()
@@ -0,0 +1,102 @@
+from PyQt5.QtWidgets import (QVBoxLayout, QHBoxLayout, QLabel, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QGroupBox)
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from database import get_database
+from db_workers import DatabaseTaskRunner
+from change_feed import shared_poller
+from fault_stats import fault_stats, format_duration
+
+def floor_order(floor):
+    """Numeric floors first, in numeric order"""
+    return (0, int(floor), "") if floor.isdigit() else (1, 0, floor)
+
+class FaultStatsPanel(QGroupBox):
+    """Fault counts and mean time to resolution from the materialised counters"""
+    # Changes arrive in bursts during imports; re-read at most this often
+    REFRESH_DELAY_MS = 1000
+    DAYS = 14
+    
+    def __init__(self, parent=None):
+        super().__init__("Arıza İstatistikleri", parent)
+        self.db = get_database()
+        self.runner = DatabaseTaskRunner(self)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(self.REFRESH_DELAY_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.init_ui()
+        shared_poller().faults_changed.connect(self.on_faults_changed)
+    
+    def init_ui(self):
+        layout = QVBoxLayout()
+        
+        self.summary_label = QLabel("İstatistikler yükleniyor...")
+        self.summary_label.setFont(QFont("Arial", 11, QFont.Bold))
+        layout.addWidget(self.summary_label)
+        
+        tables_layout = QHBoxLayout()
+        self.floor_table = self.create_table(["Kat", "Açık"])
+        self.reporter_table = self.create_table(["Departman", "Açık", "Toplam"])
+        self.day_table = self.create_table(["Tarih", "Arıza"])
+        for title, table in (("Kata göre açık arızalar", self.floor_table),
+                             ("Departmana göre arızalar", self.reporter_table),
+                             (f"Son {self.DAYS} gün", self.day_table)):
+            column = QVBoxLayout()
+            column.addWidget(QLabel(title))
+            column.addWidget(table)
+            tables_layout.addLayout(column)
+        layout.addLayout(tables_layout)
+        
+        self.setLayout(layout)
+    
+    def create_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.setMaximumHeight(180)
+        return table
+    
+    def fill_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(str(value))
+                if column > 0:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+    
+    def on_faults_changed(self, faults, deleted_ids=()):
+        # Nobody looks at a hidden panel; showEvent() catches up
+        if self.isVisible():
+            self.refresh_timer.start()
+    
+    def refresh(self):
+        self.refresh_timer.stop()
+        self.runner.submit("fault_stats", fault_stats, self.db, self.DAYS,
+                           on_result=self.show_stats)
+    
+    def show_stats(self, stats):
+        if not stats:
+            self.summary_label.setText("İstatistikler alınamadı")
+            return
+        by_status = stats["by_status"]
+        parts = [f"{status}: {count}" for status, count in by_status.items()]
+        parts.append(f"Ortalama çözüm süresi: {format_duration(stats['mean_time_to_resolution'])}"
+                     f" ({stats['resolved_count']} arıza)")
+        self.summary_label.setText("   |   ".join(parts))
+        
+        self.fill_table(self.floor_table, sorted(stats["open_by_floor"].items(),
+                                                 key=lambda item: floor_order(item[0])))
+        open_by_reporter = stats["open_by_reporter"]
+        self.fill_table(self.reporter_table,
+                        [(reporter, open_by_reporter.get(reporter, 0), total)
+                         for reporter, total in sorted(stats["by_reporter"].items(),
+                                                       key=lambda item: -item[1])])
+        self.fill_table(self.day_table, sorted(stats["per_day"].items(), reverse=True))
@@ -7,14 +7,21 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QColor
 from datetime import datetime
-from database import HotelDatabase
+from database import get_database
+from records import SpecialService
+from db_workers import DatabaseTaskRunner
+from ui_lazy_tab import LazyTab
+from change_feed import shared_poller
 
 class ShiftManagementWidget(QWidget):
     def __init__(self):
         super().__init__()
-        self.db = HotelDatabase()
+        self.db = get_database()
+        self.runner = DatabaseTaskRunner(self)
+        self.loaded_shift = None
         self.init_ui()
         self.load_shift_data()
+        shared_poller().shift_changed.connect(self.on_shift_changed)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -141,11 +148,24 @@ class ShiftManagementWidget(QWidget):
     
     def load_shift_data(self):
         """Load today's shift data"""
-        shift_data = self.db.get_today_shift()
+        self.runner.submit("shift", self.db.get_today_shift, on_result=self.show_shift_data)
+    
+    def form_values(self):
+        return (self.working_staff_edit.text().strip(),
+                self.on_leave_edit.text().strip(),
+                getattr(self, 'current_color', None))
+    
+    def on_shift_changed(self, shift_data):
+        """Show a shift saved elsewhere unless the form has unsaved edits"""
+        if self.loaded_shift is None or self.form_values() == self.loaded_shift:
+            self.show_shift_data(shift_data)
+    
+    def show_shift_data(self, shift_data):
+        """Fill the form with the shift read from the database"""
         if shift_data:
-            self.working_staff_edit.setText(shift_data[2] or "")
-            self.on_leave_edit.setText(shift_data[3] or "")
-            if shift_data[4]:
+            self.working_staff_edit.setText(shift_data.working_staff or "")
+            self.on_leave_edit.setText(shift_data.on_leave or "")
+            if shift_data.cover_color:
                 # Find color code for the saved color name
                 color_map = {
                     "Kırmızı": "#FF0000",
@@ -155,10 +175,11 @@ class ShiftManagementWidget(QWidget):
                     "Mor": "#800080",
                     "Turuncu": "#FFA500"
                 }
-                color_code = color_map.get(shift_data[4], "#FFFFFF")
-                self.set_cover_color(shift_data[4], color_code)
+                color_code = color_map.get(shift_data.cover_color, "#FFFFFF")
+                self.set_cover_color(shift_data.cover_color, color_code)
         else:
             self.current_color = None
+        self.loaded_shift = self.form_values()
     
     def save_shift_data(self):
         """Save shift data to database"""
@@ -167,7 +188,15 @@ class ShiftManagementWidget(QWidget):
         on_leave = self.on_leave_edit.text().strip()
         cover_color = getattr(self, 'current_color', None)
         
-        if self.db.update_shift(today, working_staff, on_leave, cover_color):
+        self.runner.submit("save_shift", self.db.update_shift,
+                           today, working_staff, on_leave, cover_color,
+                           on_result=self.on_shift_saved,
+                           on_error=lambda message: self.on_shift_saved(False))
+    
+    def on_shift_saved(self, success):
+        if success:
+            # The form now matches the database, so pushed shifts show again
+            self.loaded_shift = self.form_values()
             QMessageBox.information(self, "Başarılı", "Vardiya bilgileri kaydedildi!")
         else:
             QMessageBox.warning(self, "Hata", "Vardiya bilgileri kaydedilemedi!")
@@ -175,9 +204,12 @@ class ShiftManagementWidget(QWidget):
 class SpecialServiceWidget(QWidget):
     def __init__(self):
         super().__init__()
-        self.db = HotelDatabase()
+        self.db = get_database()
+        self.runner = DatabaseTaskRunner(self)
+        self.service_items = {}
         self.init_ui()
         self.load_special_services()
+        shared_poller().special_services_changed.connect(self.on_special_services_changed)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -233,23 +265,60 @@ class SpecialServiceWidget(QWidget):
     
     def load_special_services(self):
         """Load today's special services"""
-        services = self.db.get_today_special_services()
+        self.runner.submit("services", self.db.get_today_special_services,
+                           on_result=self.show_special_services)
+    
+    def show_special_services(self, services):
+        """Fill the list with the services read from the database"""
         self.services_list.clear()
+        self.service_items = {}
         
         for service in services:
-            item_text = f"ID: {service[0]} | {service[2]} | Durum: {service[3]}"
-            item = QListWidgetItem(item_text)
-            
-            # Color code based on status
-            if service[3] == "Beklemede":
-                item.setBackground(QColor("#FFF3CD"))
-            elif service[3] == "Tamamlandı":
-                item.setBackground(QColor("#D4EDDA"))
-            elif service[3] == "İptal":
-                item.setBackground(QColor("#F8D7DA"))
-            
+            item = QListWidgetItem()
+            self.update_service_item(item, service)
+            self.service_items[service.id] = item
             self.services_list.addItem(item)
     
+    def update_service_item(self, item, service):
+        """Set an item's text and colour from a SpecialService"""
+        item.setText(f"ID: {service.id} | {service.service_description} | Durum: {service.status}")
+        
+        # Color code based on status
+        if service.status == "Beklemede":
+            item.setBackground(QColor("#FFF3CD"))
+        elif service.status == "Tamamlandı":
+            item.setBackground(QColor("#D4EDDA"))
+        elif service.status == "İptal":
+            item.setBackground(QColor("#F8D7DA"))
+    
+    def remove_service_item(self, service_id):
+        item = self.service_items.pop(service_id, None)
+        if item is not None:
+            self.services_list.takeItem(self.services_list.row(item))
+    
+    def on_special_services_changed(self, services, deleted_ids):
+        """Patch the list with changed services, keeping selection and scroll"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        for service_id in deleted_ids:
+            self.remove_service_item(service_id)
+        for service in services:
+            item = self.service_items.get(service.id)
+            if service.date != today:
+                self.remove_service_item(service.id)
+            elif item is not None:
+                self.update_service_item(item, service)
+            else:
+                # Newest first, like get_today_special_services()
+                row = sum(1 for other_id in self.service_items if other_id > service.id)
+                item = QListWidgetItem()
+                self.update_service_item(item, service)
+                self.service_items[service.id] = item
+                self.services_list.insertItem(row, item)
+    
+    def on_service_added(self, service_id, values):
+        """Insert just the new row instead of reloading the list"""
+        self.on_special_services_changed([SpecialService(service_id, *values)], set())
+    
     def add_special_service(self):
         """Add new special service"""
         dialog = QDialog(self)
@@ -280,9 +349,18 @@ class SpecialServiceWidget(QWidget):
                 return
             
             today = datetime.now().strftime('%Y-%m-%d')
-            if self.db.add_special_service(today, description, status_combo.currentText()):
+            button_box.setEnabled(False)
+            dialog.new_service = (today, description, status_combo.currentText())
+            self.runner.submit("add_service", self.db.add_special_service,
+                               *dialog.new_service,
+                               on_result=service_saved,
+                               on_error=lambda message: service_saved(None))
+        
+        def service_saved(service_id):
+            button_box.setEnabled(True)
+            if service_id:
                 QMessageBox.information(dialog, "Başarılı", "Özel servis eklendi!")
-                self.load_special_services()
+                self.on_service_added(service_id, dialog.new_service)
                 dialog.accept()
             else:
                 QMessageBox.warning(dialog, "Hata", "Özel servis eklenemedi!")
@@ -295,9 +373,11 @@ class SpecialServiceWidget(QWidget):
 class MenuManagementWidget(QWidget):
     def __init__(self):
         super().__init__()
-        self.db = HotelDatabase()
+        self.db = get_database()
+        self.runner = DatabaseTaskRunner(self)
         self.init_ui()
         self.load_menu_data()
+        shared_poller().menu_changed.connect(self.on_menu_changed)
     
     def init_ui(self):
         layout = QVBoxLayout()
@@ -403,21 +483,30 @@ Tatlılar:
     
     def load_menu_data(self):
         """Load menu data"""
-        # Load daily menu
-        menu_data = self.db.get_today_menu()
+        self.runner.submit("menu", self.db.get_today_menu, on_result=self.show_menu)
+        self.runner.submit("cocktails", self.db.get_cocktail_recipes,
+                           on_result=self.show_cocktail_recipes)
+    
+    def show_menu(self, menu_data):
+        """Show today's menu read from the database"""
         if menu_data:
-            self.menu_edit.setPlainText(menu_data[2])
-        
-        # Load cocktail recipes
-        recipes = self.db.get_cocktail_recipes()
+            self.menu_edit.setPlainText(menu_data.food_menu)
+    
+    def on_menu_changed(self, menu_data):
+        """Show a menu saved elsewhere unless there are unsaved edits here"""
+        if not self.menu_edit.document().isModified():
+            self.show_menu(menu_data)
+    
+    def show_cocktail_recipes(self, recipes):
+        """Fill the cocktail list with the recipes read from the database"""
         self.cocktail_list.clear()
         
         for recipe in recipes:
-            item_text = f"""🍹 {recipe[1]}
+            item_text = f"""🍹 {recipe.name}
 
-📝 Tarif: {recipe[2]}
+📝 Tarif: {recipe.recipe}
 
-🥃 Malzemeler: {recipe[3]}"""
+🥃 Malzemeler: {recipe.ingredients}"""
             
             item = QListWidgetItem(item_text)
             item.setFont(QFont("Arial", 10))
@@ -432,7 +521,13 @@ Tatlılar:
             QMessageBox.warning(self, "Hata", "Menü boş olamaz!")
             return
         
-        if self.db.update_menu(today, menu_text):
+        self.runner.submit("save_menu", self.db.update_menu, today, menu_text,
+                           on_result=self.on_menu_saved,
+                           on_error=lambda message: self.on_menu_saved(False))
+    
+    def on_menu_saved(self, success):
+        if success:
+            self.menu_edit.document().setModified(False)
             QMessageBox.information(self, "Başarılı", "Günlük menü kaydedildi!")
         else:
             QMessageBox.warning(self, "Hata", "Menü kaydedilemedi!")
@@ -475,10 +570,10 @@ class FBManagementWidget(QWidget):
             }
         """)
         
-        # Add tabs
-        tab_widget.addTab(ShiftManagementWidget(), "Vardiya Yönetimi")
-        tab_widget.addTab(SpecialServiceWidget(), "Özel Servis")
-        tab_widget.addTab(MenuManagementWidget(), "Menü Yönetimi")
+        # Add tabs; each one is built (and loads its data) when first shown
+        tab_widget.addTab(LazyTab("ShiftManagementWidget", ShiftManagementWidget), "Vardiya Yönetimi")
+        tab_widget.addTab(LazyTab("SpecialServiceWidget", SpecialServiceWidget), "Özel Servis")
+        tab_widget.addTab(LazyTab("MenuManagementWidget", MenuManagementWidget), "Menü Yönetimi")
         
         layout.addWidget(tab_widget)
         self.setLayout(layout)
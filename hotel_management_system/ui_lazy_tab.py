@@ -0,0 +1,53 @@
+import time
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt5.QtCore import Qt, QTimer
+
+import profiling
+
+class LazyTab(QWidget):
+    """Tab page that builds its real widget the first time it is shown.
+
+    ``factory`` is called with no arguments and should import its module
+    itself, so hidden tabs cost neither import nor construction time.
+    A tab created with ``ready=False`` shows a placeholder and is not built
+    before set_ready() is called, e.g. once the database can be used.
+    """
+
+    def __init__(self, name, factory, parent=None, ready=True):
+        super().__init__(parent)
+        self.name = name
+        self.factory = factory
+        self.widget = None
+        self.ready = ready
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+        self.placeholder = None
+        if not ready:
+            self.placeholder = QLabel("Veritabanı hazırlanıyor...")
+            self.placeholder.setAlignment(Qt.AlignCenter)
+            layout.addWidget(self.placeholder)
+
+    def set_ready(self):
+        """Allow building; builds now if the tab is already on screen"""
+        self.ready = True
+        if self.placeholder is not None:
+            self.placeholder.deleteLater()
+            self.placeholder = None
+        if self.isVisible():
+            QTimer.singleShot(0, self.ensure_built)
+
+    def ensure_built(self):
+        """Build the real widget now if it has not been built yet"""
+        if self.widget is None and self.ready:
+            start = time.perf_counter()
+            self.widget = self.factory()
+            self.layout().addWidget(self.widget)
+            profiling.record_widget(self.name, time.perf_counter() - start)
+        return self.widget
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.widget is None and self.ready:
+            # Build after this show has been processed so the frame paints first
+            QTimer.singleShot(0, self.ensure_built)